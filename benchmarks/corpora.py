@@ -0,0 +1,121 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import random
+import typing as t
+from pathlib import Path
+
+PACKAGES = (
+    "aiofiles",
+    "aiohttp",
+    "attrs",
+    "black",
+    "click",
+    "Django",
+    "numpy",
+    "pandas",
+    "requests",
+    "SQLAlchemy",
+    "typing_extensions",
+    "zope.interface",
+)
+EXTRAS = ("speedups", "security", "socks", "dev")
+COMPARATORS = (">=", "<", "==", "~=", "!=", "<=", ">")
+MARKERS = (
+    'python_version >= "3.8"',
+    'python_version < "3.12"',
+    'sys_platform == "linux"',
+    'platform_machine == "x86_64"',
+    'implementation_name == "cpython"',
+)
+
+
+def _version(rng: random.Random) -> str:
+    version = ".".join(str(rng.randint(0, 30)) for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.1:
+        version += rng.choice(("a", "b", "rc")) + str(rng.randint(1, 5))
+    return version
+
+
+def _requirement(rng: random.Random, i: int, *, markers: int = 0) -> str:
+    line = f"{rng.choice(PACKAGES)}-{i}"
+    if rng.random() < 0.2:
+        line += f"[{','.join(rng.sample(EXTRAS, rng.randint(1, 2)))}]"
+    line += ",".join(
+        f"{rng.choice(COMPARATORS)}{_version(rng)}" for _ in range(rng.randint(0, 3))
+    )
+    if markers:
+        line += "; " + " and ".join(rng.sample(MARKERS, markers))
+    return line
+
+
+def flat_file(path: Path, lines: int = 10_000, *, seed: int = 0) -> Path:
+    rng = random.Random(seed)
+
+    with path.open("w") as f:
+        for i in range(lines):
+            if i % 50 == 0:
+                f.write(f"# Section {i // 50}\n\n")
+            f.write(f"{_requirement(rng, i)}\n")
+
+    return path
+
+
+def marker_file(path: Path, lines: int = 10_000, *, seed: int = 0) -> Path:
+    rng = random.Random(seed)
+
+    with path.open("w") as f:
+        for i in range(lines):
+            f.write(f"{_requirement(rng, i, markers=rng.randint(1, 3))}\n")
+
+    return path
+
+
+def nested_files(
+    directory: Path, depth: int = 100, lines: int = 20, *, seed: int = 0
+) -> Path:
+    # Each file includes the next, so parsing the first walks the whole chain.
+    rng = random.Random(seed)
+
+    for level in range(depth):
+        with (directory / f"requirements-{level}.txt").open("w") as f:
+            if level + 1 < depth:
+                f.write(f"-r requirements-{level + 1}.txt\n")
+            for i in range(lines):
+                f.write(f"{_requirement(rng, level * lines + i)}\n")
+
+    return directory / "requirements-0.txt"
+
+
+def version_sweep(count: int = 1_000_000) -> t.Iterator[str]:
+    # Every version is distinct so nothing can be served from a cache.
+    for i in range(count):
+        version = f"{i // 10_000}.{i // 100 % 100}.{i % 100}"
+        if i % 7 == 0:
+            version += f"rc{i % 5}"
+        yield version
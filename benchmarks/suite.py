@@ -0,0 +1,188 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+import corpora
+
+import severn
+from severn.api.constraint import Constraint
+from severn.api.parsers import RequirementsFile
+
+REPO_DIR = Path(__file__).parent.parent
+RESULTS_FILE = REPO_DIR / ".benchmarks" / "results.json"
+BASELINE_FILE = REPO_DIR / ".benchmarks" / "baseline.json"
+
+BenchFT = t.Callable[[], object]
+
+
+def parse(path: Path) -> BenchFT:
+    return lambda: asyncio.run(RequirementsFile(path).parse())
+
+
+def likes_version(constraint: str, versions: t.List[str]) -> BenchFT:
+    c = Constraint.from_string(constraint)
+    return lambda: sum(c.likes_version(v) for v in versions)
+
+
+def from_string(constraints: t.List[str]) -> BenchFT:
+    return lambda: [Constraint.from_string(c) for c in constraints]
+
+
+def build_cases(directory: Path, scale: float) -> t.Dict[str, BenchFT]:
+    lines = int(10_000 * scale)
+    depth = max(int(100 * scale), 2)
+    sweep = int(1_000_000 * scale)
+
+    flat = corpora.flat_file(directory / "flat.txt", lines)
+    markers = corpora.marker_file(directory / "markers.txt", lines)
+    nested_dir = directory / "nested"
+    nested_dir.mkdir()
+    nested = corpora.nested_files(nested_dir, depth)
+    versions = list(corpora.version_sweep(sweep))
+
+    return {
+        f"parse_flat_{lines}": parse(flat),
+        f"parse_markers_{lines}": parse(markers),
+        f"parse_nested_depth_{depth}": parse(nested),
+        f"constraint_from_string_{lines}": from_string(
+            [f">={v}" for v in versions[:lines]]
+        ),
+        f"likes_version_sweep_{sweep}": likes_version(">=25.50.0", versions),
+    }
+
+
+def run(cases: t.Dict[str, BenchFT], repeat: int) -> t.Dict[str, t.Dict[str, t.Any]]:
+    results = {}
+
+    for name, func in cases.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        results[name] = {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "runs": timings,
+        }
+        print(f"{name:<40} {min(timings) * 1000:>10.1f} ms")
+
+    return results
+
+
+def compare(
+    results: t.Dict[str, t.Dict[str, t.Any]],
+    baseline: t.Dict[str, t.Dict[str, t.Any]],
+    threshold: float,
+) -> t.List[str]:
+    # The fastest run is the least noisy estimate of what the code costs.
+    regressions = []
+
+    for name, result in results.items():
+        if not (base := baseline.get(name)):
+            print(f"{name:<40} {'(no baseline)':>10}")
+            continue
+
+        ratio = result["min"] / base["min"]
+        flag = "REGRESSED" if ratio > 1 + threshold else ""
+        print(f"{name:<40} {ratio:>9.2f}x {flag}")
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Severn's hot paths.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="shrink or grow every corpus"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fail if any benchmark is this fraction slower than the baseline",
+    )
+    parser.add_argument("--output", type=Path, default=RESULTS_FILE)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the new baseline",
+    )
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(build_cases(Path(tmp), opts.scale), opts.repeat)
+
+    report = {
+        "severn": severn.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    opts.output.parent.mkdir(parents=True, exist_ok=True)
+    opts.output.write_text(json.dumps(report, indent=2))
+
+    if opts.save_baseline:
+        opts.baseline.parent.mkdir(parents=True, exist_ok=True)
+        opts.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nSaved baseline to {opts.baseline}")
+        return
+
+    if not opts.baseline.exists():
+        # Passing without anything to compare against would make the gate
+        # a no-op wherever nobody has saved one (CI, fresh checkouts).
+        print(
+            f"\nNo baseline at {opts.baseline}; run with --save-baseline first",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    print(f"\nCompared to {opts.baseline} (threshold {opts.threshold:.0%}):")
+    baseline = json.loads(opts.baseline.read_text())["results"]
+    if regressions := compare(results, baseline, opts.threshold):
+        print(f"\n{len(regressions):,} benchmark(s) regressed", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
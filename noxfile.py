@@ -38,6 +38,7 @@ REPO_DIR = Path(__file__).parent
 PROJECT_NAME = REPO_DIR.stem
 PROJECT_DIR = REPO_DIR / PROJECT_NAME
 TEST_DIR = REPO_DIR / "tests"
+BENCHMARK_DIR = REPO_DIR / "benchmarks"
 NOX_FILE = REPO_DIR / "noxfile.py"
 SETUP_FILE = REPO_DIR / "setup.py"
 REQUIREMENTS_FILE = REPO_DIR / "requirements/nox.txt"
@@ -91,6 +92,12 @@ def alls(session: nox.Session) -> None:
     session.run("python", "scripts/alls.py")
 
 
+@nox.session(reuse_venv=True)
+@install(meta=True)
+def benchmark(session: nox.Session) -> None:
+    session.run("python", "benchmarks/suite.py", *session.posargs)
+
+
 @nox.session(reuse_venv=True)
 @install()
 def dependencies(session: nox.Session) -> None:
@@ -103,7 +110,7 @@ def formatting(session: nox.Session) -> None:
     session.run(
         "black",
         "--check",
-        *sp(PROJECT_DIR, TEST_DIR, NOX_FILE, SETUP_FILE),
+        *sp(PROJECT_DIR, TEST_DIR, BENCHMARK_DIR, NOX_FILE, SETUP_FILE),
     )
 
 
@@ -115,6 +122,7 @@ def licensing(session: nox.Session) -> None:
     for path in (
         *PROJECT_DIR.rglob("*.py"),
         *TEST_DIR.rglob("*.py"),
+        *BENCHMARK_DIR.rglob("*.py"),
         NOX_FILE,
         SETUP_FILE,
     ):
@@ -151,10 +159,26 @@ def slots(session: nox.Session) -> None:
 @install()
 def spelling(session: nox.Session) -> None:
     session.run(
-        "codespell", *sp(PROJECT_DIR, TEST_DIR, NOX_FILE, SETUP_FILE), "-L", "alls"
+        "codespell",
+        *sp(PROJECT_DIR, TEST_DIR, BENCHMARK_DIR, NOX_FILE, SETUP_FILE),
+        "-L",
+        "alls",
     )
 
 
+@nox.session(reuse_venv=True)
+@install(meta=True)
+def startup(session: nox.Session) -> None:
+    session.run("python", "scripts/startup.py", *session.posargs)
+
+
+@nox.session(reuse_venv=True)
+@install(meta=True)
+def tests(session: nox.Session) -> None:
+    session.run("coverage", "run", "--source", PROJECT_NAME, "-m", "pytest")
+    session.run("coverage", "report", "-m")
+
+
 @nox.session(reuse_venv=True)
 @install(rfiles=["types"])
 def typing(session: nox.Session) -> None:
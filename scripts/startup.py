@@ -0,0 +1,96 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import subprocess
+import sys
+import typing as t
+
+FORBIDDEN_MODULES = ("aiofiles", "aiohttp", "severn.api.parsers")
+
+
+def measure(args: t.List[str]) -> t.Tuple[float, t.Set[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "severn", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        self_us, _, module = line[12:].split("|")
+        if not self_us.strip().isdigit():
+            # The header line.
+            continue
+
+        total += int(self_us)
+        modules.add(module.strip())
+
+    return total / 1000, modules
+
+
+def is_forbidden(module: str) -> bool:
+    return any(module == f or module.startswith(f"{f}.") for f in FORBIDDEN_MODULES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check Severn's startup time.")
+    parser.add_argument("--budget", type=float, default=80.0, help="in milliseconds")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("args", nargs="*", default=["--help"])
+    opts = parser.parse_args()
+
+    # Take the best run so a busy machine doesn't fail the check for us.
+    results = [measure(opts.args) for _ in range(opts.runs)]
+    elapsed, modules = min(results, key=lambda r: r[0])
+    print(f"severn {' '.join(opts.args)}: {elapsed:.1f} ms of imports")
+
+    err = False
+    if elapsed > opts.budget:
+        print(f"Over the {opts.budget:.0f} ms startup budget", file=sys.stderr)
+        err = True
+
+    if loaded := sorted(m for m in modules if is_forbidden(m)):
+        print(
+            "Imported modules that should be lazy:\n"
+            + "\n".join(f" - {m}" for m in loaded),
+            file=sys.stderr,
+        )
+        err = True
+
+    if err:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
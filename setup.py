@@ -106,6 +106,7 @@ setuptools.setup(
     },
     install_requires=parse_requirements("requirements/base.txt"),
     # extras_require={},
+    entry_points={"console_scripts": ["severn = severn.ux:main"]},
     python_requires=">=3.8.0,<3.13",
     packages=setuptools.find_packages(),
     include_package_data=True,
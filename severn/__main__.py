@@ -26,17 +26,7 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import sys
-
-from severn import __version__
-
-BANNER = """
-     ###########     #########  ####       ###    ##########   ###########    ##########
-  ####            ####         ####       ###  ####           ###      ####  ####     ####
-   ##########   ############   ####      ###  ############   ###      ####  ###      ####
-          ####  ####            ###     ###   ####          ##########     ####     ####
-############     ##########      #########     ##########  ####     ###   ####     ####
-"""  # noqa: E501
+from severn.ux import main
 
 if __name__ == "__main__":
-    sys.stdout.write(f"{BANNER}\nSevern v{__version__}\n")
+    main()
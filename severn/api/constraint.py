@@ -26,12 +26,12 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-__all__ = ("Constraint",)
+__all__ = ("Constraint", "version_tuple")
 
 import re
 from dataclasses import KW_ONLY, dataclass
-from functools import partial
-from typing import List, Optional, Tuple
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
 
 CONSTRAINT_PATTERN = re.compile(
     r"""^
@@ -48,6 +48,7 @@ CONSTRAINT_PATTERN = re.compile(
     re.VERBOSE | re.IGNORECASE,
 )
 MAX_VERSION = 0x3FFFFFFF
+RELEASE_WIDTH = 6
 PRE_LABEL_MAPPING = {"a": "alpha", "b": "beta"}
 
 
@@ -85,6 +86,17 @@ def _safe_int(value: Optional[str], default: int = MAX_VERSION) -> int:
     return int(value) if value is not None else default
 
 
+Comparator = Callable[[Tuple[int, ...], Tuple[int, ...]], bool]
+COMPARATORS: Dict[str, Comparator] = {
+    "==": _eq_comparator,
+    "!=": _ne_comparator,
+    ">": _gt_comparator,
+    ">=": _ge_comparator,
+    "<": _lt_comparator,
+    "<=": _le_comparator,
+}
+
+
 @dataclass()
 class Constraint:
     comparator: str
@@ -98,16 +110,26 @@ class Constraint:
     dev: int = MAX_VERSION
 
     def __post_init__(self) -> None:
-        comparator_mapping = {
-            "==": _eq_comparator,
-            "!=": _ne_comparator,
-            ">": _gt_comparator,
-            ">=": _ge_comparator,
-            "<": _lt_comparator,
-            "<=": _le_comparator,
-            "~=": partial(_fuzzy_comparator, len(self.release)),
-        }
-        self._cfunc = comparator_mapping[self.comparator]
+        # Looked up rather than built per instance -- constraints are created
+        # in bulk when parsing and loading.
+        self._cfunc: Comparator = (
+            partial(_fuzzy_comparator, len(self.release))
+            if self.comparator == "~="
+            else COMPARATORS[self.comparator]
+        )
+
+    def __str__(self) -> str:
+        version = ".".join(str(r) for r in self.release)
+        if self.epoch:
+            version = f"{self.epoch}!{version}"
+        for label, n in (("a", self.alpha), ("b", self.beta), ("rc", self.rc)):
+            if n != MAX_VERSION:
+                version += f"{label}{n}"
+        if self.post != MAX_VERSION:
+            version += f".post{self.post}"
+        if self.dev != MAX_VERSION:
+            version += f".dev{self.dev}"
+        return f"{self.comparator}{version}"
 
     @classmethod
     def from_string(cls, raw: str, /) -> "Constraint":
@@ -154,13 +176,28 @@ class Constraint:
             self.dev,
         )
 
+    @property
+    def is_prerelease(self) -> bool:
+        return min(self.alpha, self.beta, self.rc, self.dev) != MAX_VERSION
+
     def likes_version(self, version: str, /) -> bool:
-        other = Constraint.from_string(f"=={version}")
+        other = _version_constraint(version)
         specificity = (
             max(sl, ol)
             if (sl := len(self.release)) != (ol := len(other.release))
             else None
         )
-        return self._cfunc(  # type: ignore[no-any-return, operator]
-            other.as_tuple(specificity), self.as_tuple(specificity)
-        )
+        return self._cfunc(other.as_tuple(specificity), self.as_tuple(specificity))
+
+
+@lru_cache(maxsize=4096)
+def _version_constraint(version: str) -> Constraint:
+    # The same handful of versions get checked against constraint after
+    # constraint, so there's no sense running the regex for each of them.
+    return Constraint.from_string(f"=={version}")
+
+
+def version_tuple(version: str, /) -> Tuple[int, ...]:
+    # Padding every release to the same width keeps the tuples of
+    # differently-specified versions comparable with one another.
+    return _version_constraint(version).as_tuple(RELEASE_WIDTH)
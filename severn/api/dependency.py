@@ -43,6 +43,7 @@ class Dependency:
     extras: List[str] = field(default_factory=list)
     location: Optional[Union[str, Path]] = None
     editable: bool = False
+    hashes: List[str] = field(default_factory=list)
 
     def __str__(self) -> str:
         return self.name
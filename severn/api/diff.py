@@ -0,0 +1,243 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Operation", "RequirementChange", "diff_requirements", "plan")
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from severn.api.constraint import MAX_VERSION, RELEASE_WIDTH, Constraint, version_tuple
+from severn.api.dependency import Dependency
+from severn.api.utils import normalize_name
+
+ADDED = "added"
+REMOVED = "removed"
+TIGHTENED = "tightened"
+LOOSENED = "loosened"
+UNCHANGED = "unchanged"
+CHANGED = "changed"
+
+REMOVE = "remove"
+UPGRADE = "upgrade"
+DOWNGRADE = "downgrade"
+REINSTALL = "reinstall"
+INSTALL = "install"
+
+# Never planned for removal, since they're what does the installing (the
+# same set pip-sync leaves alone, plus ourselves).
+PROTECTED = frozenset({"pip", "setuptools", "wheel", "severn"})
+
+# Removals go first so nothing that's on its way out can get in the way of
+# what replaces it, and installs go last so they land on the final versions
+# of everything else.
+ACTION_ORDER = {REMOVE: 0, UPGRADE: 1, DOWNGRADE: 1, REINSTALL: 1, INSTALL: 2}
+
+# Bounds are (version tuple, tiebreak) pairs, so a tighter bound on either
+# side compares as "further in": exclusive lower bounds sort after inclusive
+# ones at the same version, and exclusive upper bounds before them.
+Bound = Tuple[Tuple[int, ...], int]
+NO_LOWER: Bound = ((), 0)
+NO_UPPER: Bound = ((MAX_VERSION + 1,), 1)
+
+
+@dataclass()
+class RequirementChange:
+    name: str
+    kind: str
+    before: Optional[Dependency] = None
+    after: Optional[Dependency] = None
+
+
+@dataclass()
+class Operation:
+    action: str
+    name: str
+    current: Optional[str] = None
+    target: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class _Interval:
+    lower: Bound
+    upper: Bound
+    excluded: FrozenSet[Tuple[int, ...]]
+
+    def contains(self, version: Tuple[int, ...]) -> bool:
+        return self.spans(version) and version not in self.excluded
+
+    def spans(self, version: Tuple[int, ...]) -> bool:
+        return self.lower <= (version, 0) and (version, 1) <= self.upper
+
+    def issubset(self, other: "_Interval") -> bool:
+        if self.lower >= self.upper:
+            # Nothing satisfies this, which makes it a subset of anything.
+            return True
+
+        return (
+            self.lower >= other.lower
+            and self.upper <= other.upper
+            and all(not self.contains(v) or v in self.excluded for v in other.excluded)
+        )
+
+
+def _bounds(c: Constraint) -> Tuple[Bound, Bound, Optional[Tuple[int, ...]]]:
+    version = c.as_tuple(RELEASE_WIDTH)
+
+    if c.comparator == "==":
+        return (version, 0), (version, 1), None
+    if c.comparator == "!=":
+        return NO_LOWER, NO_UPPER, version
+    if c.comparator == ">=":
+        return (version, 0), NO_UPPER, None
+    if c.comparator == ">":
+        return (version, 1), NO_UPPER, None
+    if c.comparator == "<=":
+        return NO_LOWER, (version, 1), None
+    if c.comparator == "<":
+        return NO_LOWER, (version, 0), None
+
+    # ~= pins everything but the last release segment it was given (the
+    # prefix includes the epoch), so it's bounded above like "<" the next
+    # prefix up: ~=1.4.2 is <1.5, pre-release slots and all.
+    epoch, *prefix = c.as_tuple()[: len(c.release)]
+    if prefix:
+        prefix[-1] += 1
+    else:
+        epoch += 1
+    upper = Constraint("<", prefix or [0], epoch=epoch).as_tuple(RELEASE_WIDTH)
+    return (version, 0), (upper, 0), None
+
+
+def _interval(constraints: Iterable[Constraint]) -> _Interval:
+    lower, upper = NO_LOWER, NO_UPPER
+    excluded = []
+
+    for c in constraints:
+        lo, hi, ex = _bounds(c)
+        lower, upper = max(lower, lo), min(upper, hi)
+        if ex:
+            excluded.append(ex)
+
+    interval = _Interval(lower, upper, frozenset())
+    # Exclusions outside the bounds don't change anything, and keeping them
+    # would make otherwise identical intervals compare unequal.
+    return _Interval(lower, upper, frozenset(v for v in excluded if interval.spans(v)))
+
+
+def _index(
+    dependencies: Iterable[Dependency],
+) -> Dict[str, Tuple[Dependency, List[Constraint]]]:
+    # Repeated names are combined, since a file may list the same thing
+    # twice (or pick it up again from an include).
+    indexed: Dict[str, Tuple[Dependency, List[Constraint]]] = {}
+
+    for dep in dependencies:
+        key = normalize_name(dep.name)
+        if existing := indexed.get(key):
+            existing[1].extend(dep.constraints)
+        else:
+            indexed[key] = (dep, list(dep.constraints))
+
+    return indexed
+
+
+def diff_requirements(
+    before: Iterable[Dependency], after: Iterable[Dependency]
+) -> List[RequirementChange]:
+    old, new = _index(before), _index(after)
+    changes = []
+
+    for key in sorted(old.keys() | new.keys()):
+        if key not in new:
+            changes.append(RequirementChange(key, REMOVED, before=old[key][0]))
+            continue
+        if key not in old:
+            changes.append(RequirementChange(key, ADDED, after=new[key][0]))
+            continue
+
+        (old_dep, old_constraints), (new_dep, new_constraints) = old[key], new[key]
+        was, now = _interval(old_constraints), _interval(new_constraints)
+
+        if was == now:
+            kind = UNCHANGED
+        elif now.issubset(was):
+            kind = TIGHTENED
+        elif was.issubset(now):
+            kind = LOOSENED
+        else:
+            kind = CHANGED
+
+        changes.append(RequirementChange(key, kind, before=old_dep, after=new_dep))
+
+    return changes
+
+
+def plan(
+    target: Mapping[str, str],
+    installed: Mapping[str, str],
+    *,
+    remove_extraneous: bool = True,
+    keep: Iterable[str] = (),
+) -> List[Operation]:
+    # Both sides are keyed by normalized name, so this is one pass over each
+    # plus a sort of whatever actually needs doing.
+    target = {normalize_name(k): v for k, v in target.items()}
+    installed = {normalize_name(k): v for k, v in installed.items()}
+    keep = PROTECTED.union(normalize_name(k) for k in keep)
+    operations: List[Operation] = []
+
+    if remove_extraneous:
+        operations.extend(
+            Operation(REMOVE, name, current=version)
+            for name, version in installed.items()
+            if name not in target and name not in keep
+        )
+
+    for name, version in target.items():
+        if (current := installed.get(name)) is None:
+            operations.append(Operation(INSTALL, name, target=version))
+            continue
+
+        if current == version:
+            continue
+
+        try:
+            ours, theirs = version_tuple(current), version_tuple(version)
+        except ValueError:
+            # Not PEP 440, so there's no telling which way this goes.
+            action = REINSTALL
+        else:
+            if ours == theirs:
+                # "1.0" and "1.0.0" are the same release.
+                continue
+            action = UPGRADE if theirs > ours else DOWNGRADE
+
+        operations.append(Operation(action, name, current=current, target=version))
+
+    operations.sort(key=lambda o: (ACTION_ORDER[o.action], o.name))
+    return operations
@@ -0,0 +1,279 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Artifact", "Downloader")
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urldefrag, urlsplit
+
+import aiofiles
+import aiohttp
+
+from severn.abc import Representable
+from severn.api.dependency import Dependency
+from severn.api.store import ContentStore
+from severn.tracing import span
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+HASH_CHUNK_SIZE = 1 << 20
+LOCK_POLL_INTERVAL = 0.1
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass()
+class Artifact:
+    url: str
+    filename: str
+    sha256: str
+    path: Path
+
+
+def _split_url(url: str) -> Tuple[str, Optional[str]]:
+    # Indexes advertise hashes as "#sha256=..." fragments (PEP 503).
+    url, fragment = urldefrag(url)
+    algorithm, _, digest = fragment.partition("=")
+    return url, digest.lower() if algorithm == "sha256" and digest else None
+
+
+def _hash_partial(path: Path) -> "hashlib._Hash":
+    hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher
+
+
+class Downloader(Representable):
+    __slots__ = (
+        "store",
+        "concurrency",
+        "chunk_size",
+        "_session",
+        "_owns_session",
+        "_semaphore",
+        "_inflight",
+    )
+
+    def __init__(
+        self,
+        store: Optional[ContentStore] = None,
+        *,
+        concurrency: int = 8,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        self.store = store or ContentStore()
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, "asyncio.Task[Artifact]"] = {}
+
+    async def __aenter__(self) -> "Downloader":
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        if not self._session:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                # Range requests are byte offsets into the file as stored, so
+                # don't let anything transparently decompress it.
+                headers={"Accept-Encoding": "identity"},
+            )
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        if self._session and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str, *, sha256: Optional[str] = None) -> Artifact:
+        url, fragment_digest = _split_url(url)
+        expected = (sha256 or fragment_digest or "").lower() or None
+        filename = unquote(urlsplit(url).path.rsplit("/", 1)[-1])
+
+        digest = expected or self.store.lookup_url(url)
+        if digest and self.store.contains(digest):
+            _log.debug("Using stored copy of %s", url)
+            return Artifact(url, filename, digest, self.store.path_for(digest))
+
+        # Don't download the same thing twice just because two dependencies
+        # point at it at the same time.
+        if not (task := self._inflight.get(url)):
+            task = asyncio.ensure_future(self._download(url, filename, expected))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+
+        return await task
+
+    async def fetch_all(self, urls: Iterable[str]) -> List[Artifact]:
+        return await asyncio.gather(*(self.fetch(u) for u in urls))
+
+    async def fetch_dependencies(
+        self, dependencies: Iterable[Dependency]
+    ) -> Dict[str, Artifact]:
+        remote = {
+            d.name: d
+            for d in dependencies
+            if str(d.location).startswith(("http://", "https://"))
+        }
+        artifacts = await asyncio.gather(
+            *(self._fetch_dependency(d) for d in remote.values())
+        )
+        return dict(zip(remote, artifacts))
+
+    async def _fetch_dependency(self, dependency: Dependency) -> Artifact:
+        url = str(dependency.location)
+        allowed = [
+            h.partition(":")[2] for h in dependency.hashes if h.startswith("sha256:")
+        ]
+
+        # A single hash can be checked while downloading; with several, any of
+        # them will do, so the check has to wait until the file is in.
+        artifact = await self.fetch(
+            url, sha256=allowed[0] if len(allowed) == 1 else None
+        )
+        if allowed and artifact.sha256 not in allowed:
+            raise ValueError(
+                f"hash mismatch for {url}: expected one of "
+                f"{', '.join(f'sha256:{h}' for h in allowed)}, "
+                f"got sha256:{artifact.sha256}"
+            )
+
+        return artifact
+
+    async def _download(
+        self, url: str, filename: str, expected: Optional[str]
+    ) -> Artifact:
+        if not (self._session and self._semaphore):
+            raise RuntimeError("the downloader must be opened before it is used")
+
+        partial = self.store.partial_path(url)
+        meta = partial.with_suffix(".json")
+
+        async with self._semaphore:
+            while (lock := self.store.lock_partial(url)) is None:
+                # Another process is downloading this right now.
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+            try:
+                # ...and may have finished it while we waited.
+                digest = expected or self.store.lookup_url(url)
+                if digest and self.store.contains(digest):
+                    _log.debug("Using stored copy of %s", url)
+                    return Artifact(url, filename, digest, self.store.path_for(digest))
+
+                with span("download.fetch", url):
+                    digest = await self._stream(url, partial, meta)
+
+                meta.unlink(missing_ok=True)
+                if expected and digest != expected:
+                    partial.unlink(missing_ok=True)
+                    raise ValueError(
+                        f"hash mismatch for {url}: expected sha256:{expected}, "
+                        f"got sha256:{digest}"
+                    )
+
+                path = self.store.add(partial, digest)
+                self.store.remember(url, digest)
+            finally:
+                os.close(lock)
+
+        _log.info("Downloaded %s (sha256:%s)", url, digest)
+        return Artifact(url, filename, digest, path)
+
+    async def _stream(self, url: str, partial: Path, meta: Path) -> str:
+        assert self._session
+        hasher = hashlib.sha256()
+        headers = {}
+        offset = 0
+
+        if partial.exists() and meta.exists():
+            # Re-hash what we already have so the digest covers the whole
+            # file, then ask for the rest -- but only if it hasn't changed.
+            validator = json.loads(meta.read_text())["validator"]
+            offset = partial.stat().st_size
+            hasher = await asyncio.get_running_loop().run_in_executor(
+                None, _hash_partial, partial
+            )
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+            _log.info("Resuming %s from byte %i", url, offset)
+
+        async with self._session.get(url, headers=headers) as r:
+            if offset and (
+                r.status == 416
+                or r.status == 206
+                and (
+                    not r.headers.get("Content-Range", "").startswith(
+                        f"bytes {offset}-"
+                    )
+                    # A server that ignores If-Range would hand us the rest
+                    # of a different file.
+                    or validator
+                    not in (r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                )
+            ):
+                restart = True
+            else:
+                restart = False
+                if r.status != 206:
+                    r.raise_for_status()
+                    hasher, offset = hashlib.sha256(), 0
+
+                if validator := self._validator(r):
+                    meta.write_text(json.dumps({"validator": validator}))
+                else:
+                    meta.unlink(missing_ok=True)
+
+                async with aiofiles.open(partial, "ab" if offset else "wb") as f:
+                    async for chunk in r.content.iter_chunked(self.chunk_size):
+                        hasher.update(chunk)
+                        await f.write(chunk)
+
+        if restart:
+            # Whatever we had is no good any more, so start from scratch.
+            partial.unlink()
+            meta.unlink(missing_ok=True)
+            return await self._stream(url, partial, meta)
+
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _validator(response: aiohttp.ClientResponse) -> Optional[str]:
+        # Weak ETags can't be used with If-Range, so without a strong one or
+        # a Last-Modified date there's no safe way to resume.
+        if (etag := response.headers.get("ETag")) and not etag.startswith("W/"):
+            return etag
+        return response.headers.get("Last-Modified")
@@ -0,0 +1,235 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = (
+    "Distribution",
+    "installed_versions",
+    "requirement_closure",
+    "scan",
+    "snapshot",
+    "unsatisfied",
+)
+
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from severn.api.dependency import Dependency
+from severn.api.markers import default_environment, evaluate
+from severn.api.utils import cache_dir, normalize_name
+from severn.tracing import span
+
+METADATA_FILES = {".dist-info": "METADATA", ".egg-info": "PKG-INFO"}
+WANTED_HEADERS = (b"name:", b"version:", b"requires-dist:")
+REQUIRES_NAME_PATTERN = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+# Installing or removing a distribution always adds or removes a directory,
+# which bumps the mtime of the path entry it lives in -- so a scan of an
+# entry stays good for as long as its mtime doesn't change. Scans are kept
+# in memory for long-running processes, and on disk so that separate runs of
+# the CLI can skip rescanning too.
+_scans: Dict[str, Tuple[int, List["Distribution"]]] = {}
+
+
+@dataclass()
+class Distribution:
+    name: str
+    version: str
+    requires: List[str] = field(default_factory=list)
+    path: str = ""
+
+
+def _read_headers(directory: str, filename: str) -> Optional[Distribution]:
+    # Plain strings and os functions throughout: this runs for every
+    # distribution in the environment, and Path objects add up.
+    path = os.path.join(directory, filename)  # noqa: PTH118
+    name = version = None
+    requires = []
+
+    try:
+        with open(path, "rb") as f:  # noqa: PTH123
+            for line in f:
+                if not line.strip():
+                    # The body (usually the README) starts after the first
+                    # blank line, and there's nothing we want in it.
+                    break
+
+                if not line[:1].isalpha() or not line.lower().startswith(
+                    WANTED_HEADERS
+                ):
+                    continue
+
+                key, _, value = line.decode("utf-8", "replace").partition(":")
+                key, value = key.lower(), value.strip()
+                if key == "name":
+                    name = value
+                elif key == "version":
+                    version = value
+                else:
+                    requires.append(value)
+    except OSError:
+        return None
+
+    if not (name and version):
+        return None
+    return Distribution(name, version, requires, directory)
+
+
+def _disk_cache(entry: str) -> Path:
+    return cache_dir() / "environments" / hashlib.sha256(entry.encode()).hexdigest()
+
+
+def scan(entry: str, *, persist: bool = True) -> List[Distribution]:
+    try:
+        mtime = os.stat(entry).st_mtime_ns  # noqa: PTH116
+    except OSError:
+        return []
+
+    if (cached := _scans.get(entry)) and cached[0] == mtime:
+        return cached[1]
+
+    disk = _disk_cache(entry)
+    if persist:
+        try:
+            data = json.loads(disk.read_text())
+            if data["mtime"] == mtime:
+                dists = [Distribution(**d) for d in data["distributions"]]
+                _scans[entry] = (mtime, dists)
+                return dists
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    dists = []
+    with span("environment.scan", entry):
+        try:
+            with os.scandir(entry) as it:
+                for item in it:
+                    suffix = item.name[item.name.rfind(".") :]
+                    if (
+                        (filename := METADATA_FILES.get(suffix))
+                        and item.is_dir()
+                        and (dist := _read_headers(item.path, filename))
+                    ):
+                        dists.append(dist)
+        except OSError:
+            # Zip files and the like, which don't hold anything we can see.
+            pass
+
+    _scans[entry] = (mtime, dists)
+    if persist:
+        try:
+            disk.parent.mkdir(parents=True, exist_ok=True)
+            tmp = disk.with_suffix(f".{os.getpid()}")
+            tmp.write_text(
+                json.dumps(
+                    {"mtime": mtime, "distributions": [asdict(d) for d in dists]}
+                )
+            )
+            tmp.replace(disk)
+        except OSError:
+            pass
+
+    return dists
+
+
+def snapshot(
+    paths: Optional[Sequence[str]] = None, *, persist: bool = True
+) -> Dict[str, Distribution]:
+    installed: Dict[str, Distribution] = {}
+
+    with span("environment.installed"):
+        for entry in sys.path if paths is None else paths:
+            for dist in scan(entry or ".", persist=persist):
+                # Earlier entries on the path shadow later ones, same as imports.
+                installed.setdefault(normalize_name(dist.name), dist)
+
+    return installed
+
+
+def installed_versions(paths: Optional[Sequence[str]] = None) -> Dict[str, str]:
+    return {name: dist.version for name, dist in snapshot(paths).items()}
+
+
+def requirement_closure(
+    names: Iterable[str], installed: Mapping[str, Distribution]
+) -> Set[str]:
+    # The given distributions and everything they (transitively) require,
+    # as far as what's installed can tell us. Requirements behind extras are
+    # left out, since nothing says those extras were asked for.
+    seen: Set[str] = set()
+    pending = [normalize_name(n) for n in names]
+
+    while pending:
+        if (name := pending.pop()) in seen:
+            continue
+        seen.add(name)
+
+        if dist := installed.get(name):
+            for requirement in dist.requires:
+                _, _, markers = requirement.partition(";")
+                if "extra" not in markers and (
+                    match := REQUIRES_NAME_PATTERN.match(requirement)
+                ):
+                    pending.append(normalize_name(match.group(1)))
+
+    return seen
+
+
+def unsatisfied(
+    dependencies: Iterable[Dependency],
+    installed: Dict[str, str],
+    environment: Optional[Mapping[str, str]] = None,
+) -> List[Tuple[Dependency, Optional[str]]]:
+    problems: List[Tuple[Dependency, Optional[str]]] = []
+    environment = environment or default_environment()
+
+    for dep in dependencies:
+        if dep.env_markers and not evaluate(dep.env_markers, environment):
+            # Doesn't apply here, so it can't be missing.
+            continue
+
+        if not (version := installed.get(normalize_name(dep.name))):
+            problems.append((dep, None))
+            continue
+
+        try:
+            if dep.likes_version(version):
+                continue
+        except ValueError:
+            # The installed version doesn't conform to PEP 440, so there's
+            # no way to say it satisfies anything.
+            pass
+
+        problems.append((dep, version))
+
+    return problems
@@ -0,0 +1,199 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("HashVerifier",)
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from severn.abc import Representable
+from severn.api.dependency import Dependency
+from severn.api.utils import (
+    ARTIFACT_EXTENSIONS,
+    cache_dir,
+    normalize_name,
+    project_name,
+)
+from severn.tracing import span
+
+# The same set pip accepts in --hash options; anything else is either too
+# weak to trust or not a hash we can name.
+ALLOWED_ALGORITHMS = frozenset({"sha256", "sha384", "sha512"})
+
+# (size, mtime_ns, ctime_ns, inode, device) -- if none of these have changed,
+# neither have the contents as far as we're prepared to care. ctime catches
+# rewrites that put the old mtime back (e.g. tar or rsync -t), since it can't
+# be set from userspace.
+StatSignature = Tuple[int, int, int, int, int]
+
+_log = logging.getLogger(__name__)
+
+
+def _stat_signature(path: Path) -> StatSignature:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino, st.st_dev
+
+
+def _check_algorithm(algorithm: str) -> None:
+    if algorithm not in ALLOWED_ALGORITHMS:
+        allowed = ", ".join(sorted(ALLOWED_ALGORITHMS))
+        raise ValueError(
+            f"unsupported hash algorithm {algorithm!r} (expected one of {allowed})"
+        )
+
+
+def _hash_file(path: Path, algorithm: str, size: int) -> str:
+    hasher = hashlib.new(algorithm)
+    if not size:
+        # Empty files can't be mapped.
+        return hasher.hexdigest()
+
+    # Hashing straight out of the page cache skips copying the file through
+    # userspace buffers, and hashlib drops the GIL for large updates, so
+    # several of these can run at once on a thread pool.
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        hasher.update(mm)
+
+    return hasher.hexdigest()
+
+
+class HashVerifier(Representable):
+    __slots__ = ("workers", "cache_path", "_cache", "_dirty", "_lock")
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        cache_path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_path = Path(cache_path) if cache_path else cache_dir() / "digests"
+        self._cache: Dict[str, Tuple[StatSignature, str]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.cache_path.open() as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self._cache = {k: (tuple(sig), digest) for k, (sig, digest) in data.items()}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(f".{os.getpid()}")
+            with tmp.open("w") as f:
+                json.dump({k: [list(s), d] for k, (s, d) in self._cache.items()}, f)
+            tmp.replace(self.cache_path)
+            self._dirty = False
+
+    def digest(self, path: Path, algorithm: str = "sha256") -> str:
+        _check_algorithm(algorithm)
+        path = path.resolve()
+        key = f"{algorithm}:{path}"
+        signature = _stat_signature(path)
+
+        if (cached := self._cache.get(key)) and cached[0] == signature:
+            return cached[1]
+
+        with span("hashing.digest", path.name):
+            digest = _hash_file(path, algorithm, signature[0])
+
+        with self._lock:
+            self._cache[key] = (signature, digest)
+            self._dirty = True
+
+        return digest
+
+    def digests(
+        self, paths: Iterable[Path], algorithm: str = "sha256"
+    ) -> Dict[Path, str]:
+        paths = list(paths)
+        with ThreadPoolExecutor(self.workers) as pool:
+            digests = pool.map(lambda p: self.digest(p, algorithm), paths)
+            result = dict(zip(paths, digests))
+
+        self.save()
+        return result
+
+    def verify(self, path: Path, hashes: Iterable[str]) -> bool:
+        allowed: Dict[str, List[str]] = {}
+        for h in hashes:
+            algorithm, _, digest = h.partition(":")
+            _check_algorithm(algorithm)
+            allowed.setdefault(algorithm, []).append(digest.lower())
+
+        return any(
+            self.digest(path, algorithm) in digests
+            for algorithm, digests in allowed.items()
+        )
+
+    def verify_wheelhouse(
+        self, directory: Path, dependencies: Iterable[Dependency]
+    ) -> Dict[Path, Optional[bool]]:
+        # None means there's nothing to check the file against, which callers
+        # insisting on hashes (like pip's --require-hashes) treat as failure.
+        hashes: Dict[str, List[str]] = {}
+        for dep in dependencies:
+            for h in dep.hashes:
+                # Caught here rather than part way through hashing everything.
+                _check_algorithm(h.partition(":")[0])
+            hashes.setdefault(normalize_name(dep.name), []).extend(dep.hashes)
+
+        artifacts = {
+            p: hashes.get(project_name(p.name) or "")
+            for p in sorted(directory.iterdir())
+            if p.name.endswith(ARTIFACT_EXTENSIONS)
+        }
+
+        with span("hashing.wheelhouse", directory), ThreadPoolExecutor(
+            self.workers
+        ) as pool:
+            results = pool.map(
+                lambda item: self.verify(*item) if item[1] else None,
+                artifacts.items(),
+            )
+            verified = dict(zip(artifacts, results))
+
+        self.save()
+        _log.info("Verified %i artifacts in %s", len(verified), directory)
+        return verified
@@ -0,0 +1,140 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("PackageIndex",)
+
+import asyncio
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from severn.abc import Representable
+from severn.api.utils import normalize_name
+from severn.tracing import span
+
+DEFAULT_INDEX_URL = "https://pypi.org/simple"
+SIMPLE_JSON_TYPE = "application/vnd.pypi.simple.v1+json"
+SDIST_EXTENSIONS = (".tar.gz", ".zip")
+ANCHOR_PATTERN = re.compile(r"<a\s[^>]*>([^<]+)</a>", re.IGNORECASE)
+
+_log = logging.getLogger(__name__)
+
+
+def _versions_from_files(name: str, files: List[Dict[str, Any]]) -> List[str]:
+    # Only used for indexes that predate PEP 700 and so don't give us a
+    # "versions" key -- wheel names are unambiguous, sdist names mostly so.
+    versions: Dict[str, None] = {}
+
+    for file in files:
+        filename: str = file["filename"]
+
+        if filename.endswith(".whl"):
+            versions[filename.split("-")[1]] = None
+            continue
+
+        for ext in SDIST_EXTENSIONS:
+            if filename.endswith(ext):
+                stem = filename[: -len(ext)]
+                if normalize_name(stem).startswith(f"{name}-"):
+                    versions[stem.rsplit("-", 1)[1]] = None
+                break
+
+    return list(versions)
+
+
+class PackageIndex(Representable):
+    __slots__ = ("url", "_session", "_versions")
+
+    def __init__(self, url: str = DEFAULT_INDEX_URL) -> None:
+        self.url = url.rstrip("/")
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Tasks rather than results, so packages asked about by several
+        # resolves at once are only fetched once.
+        self._versions: Dict[str, "asyncio.Task[List[str]]"] = {}
+
+    async def __aenter__(self) -> "PackageIndex":
+        self._session = aiohttp.ClientSession(headers={"Accept": SIMPLE_JSON_TYPE})
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def clear(self) -> None:
+        self._versions.clear()
+
+    async def versions(self, name: str, /) -> List[str]:
+        key = normalize_name(name)
+        if not (task := self._versions.get(key)):
+            if not self._session:
+                raise RuntimeError("the index must be opened before it is queried")
+
+            task = asyncio.ensure_future(self._fetch(name, key))
+            self._versions[key] = task
+            task.add_done_callback(lambda t: self._forget_failure(key, t))
+
+        return await task
+
+    def _forget_failure(self, key: str, task: "asyncio.Task[List[str]]") -> None:
+        # Only successful lookups are worth keeping; anything else should be
+        # tried again next time.
+        if (task.cancelled() or task.exception()) and self._versions.get(key) is task:
+            del self._versions[key]
+
+    async def _fetch(self, name: str, key: str) -> List[str]:
+        assert self._session
+        _log.info("Fetching available versions of %s from %s", key, self.url)
+        with span("index.versions", key):
+            async with self._session.get(f"{self.url}/{key}/") as r:
+                if r.status == 404:
+                    raise LookupError(
+                        f"package {name!r} could not be found on the index"
+                    )
+
+                r.raise_for_status()
+                if r.content_type == SIMPLE_JSON_TYPE:
+                    data = await r.json()
+                else:
+                    # Not every index speaks PEP 691, so fall back to scraping
+                    # the filenames out of the PEP 503 HTML page.
+                    page = await r.text()
+                    data = {
+                        "files": [
+                            {"filename": html.unescape(f).strip()}
+                            for f in ANCHOR_PATTERN.findall(page)
+                        ]
+                    }
+
+        versions: List[str] = data.get("versions") or _versions_from_files(
+            key, data["files"]
+        )
+        return versions
@@ -0,0 +1,311 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Installer", "WheelCache", "site_packages")
+
+import base64
+import configparser
+import csv
+import hashlib
+import io
+import logging
+import os
+import shutil
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from severn.abc import Representable
+from severn.api.utils import cache_dir, normalize_name
+from severn.tracing import span
+
+HASH_CHUNK_SIZE = 1 << 20
+SCRIPT_TEMPLATE = """\
+#!{python}
+import sys
+from {module} import {attr}
+
+if __name__ == "__main__":
+    sys.exit({func}())
+"""
+
+Record = Tuple[str, str, str]
+
+_log = logging.getLogger(__name__)
+
+
+def _file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _record_hash(data: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest())
+    return f"sha256={digest.rstrip(b'=').decode()}"
+
+
+def site_packages(prefix: Path) -> Path:
+    if os.name == "nt":
+        return prefix / "Lib" / "site-packages"
+
+    if not (candidates := sorted(prefix.glob("lib/python*/site-packages"))):
+        raise FileNotFoundError(f"no site-packages directory found in {prefix}")
+    return candidates[0]
+
+
+def _restore_exec_bits(zf: zipfile.ZipFile, root: Path) -> None:
+    # extractall() ignores the Unix mode stored in the upper half of
+    # external_attr, which leaves bundled executables unrunnable.
+    for zinfo in zf.infolist():
+        if zinfo.is_dir() or not (mode := (zinfo.external_attr >> 16) & 0o111):
+            continue
+
+        path = root / zinfo.filename
+        if path.is_file():
+            path.chmod(path.stat().st_mode | mode)
+
+
+class WheelCache(Representable):
+    __slots__ = ("root",)
+
+    def __init__(self, root: Optional[Union[str, Path]] = None) -> None:
+        self.root = Path(root) if root else cache_dir() / "wheels"
+
+    def unpack(self, wheel: Path, sha256: Optional[str] = None) -> Path:
+        digest = sha256 or _file_digest(wheel)
+        target = self.root / digest[:2] / digest[2:]
+
+        if target.is_dir():
+            return target
+
+        # Unpack beside the target and rename it into place, so a directory
+        # that exists is always a complete one.
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with span("install.unpack", wheel.name), zipfile.ZipFile(wheel) as zf:
+            zf.extractall(tmp)  # zipfile strips absolute and ".." components
+            _restore_exec_bits(zf, tmp)
+
+        try:
+            tmp.rename(target)
+        except OSError:
+            if not target.is_dir():
+                raise
+            # Another process unpacked the same wheel in the meantime.
+            shutil.rmtree(tmp)
+
+        return target
+
+
+class Installer(Representable):
+    __slots__ = ("prefix", "site_packages", "scripts_dir", "cache", "workers")
+
+    def __init__(
+        self,
+        prefix: Union[str, Path],
+        *,
+        cache: Optional[WheelCache] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.prefix = Path(prefix)
+        self.site_packages = site_packages(self.prefix)
+        self.scripts_dir = self.prefix / ("Scripts" if os.name == "nt" else "bin")
+        self.cache = cache or WheelCache()
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+
+    def install(self, wheels: Iterable[Path]) -> List[str]:
+        # Unpacking and linking are dominated by system calls that release
+        # the GIL, so threads scale well here.
+        # Each wheel writes its own RECORD as soon as it's linked, and the
+        # whole batch runs even if one wheel fails (map() would cancel the
+        # rest), so nothing is left installed but unrecorded.
+        with span("install.wheels"), ThreadPoolExecutor(self.workers) as pool:
+            futures = [pool.submit(self._install_wheel, wheel) for wheel in wheels]
+            wait(futures)
+
+        return [future.result() for future in futures]
+
+    def _install_wheel(self, wheel: Path) -> str:
+        unpacked = self.cache.unpack(wheel)
+        if not (dist_info := next(unpacked.glob("*.dist-info"), None)):
+            raise ValueError(f"{wheel.name} is not a wheel (no .dist-info directory)")
+
+        data_dir = dist_info.with_name(dist_info.name.replace(".dist-info", ".data"))
+
+        self._remove_existing(dist_info.name.split("-")[0])
+        hashes = self._wheel_hashes(dist_info / "RECORD")
+        records: List[Record] = []
+        made: Set[Path] = set()
+
+        with span("install.link", wheel.name):
+            for root, _, files in os.walk(unpacked):
+                for filename in files:
+                    src = Path(root, filename)
+                    rel = src.relative_to(unpacked).as_posix()
+
+                    if not (dst := self._destination(rel, data_dir.name)):
+                        continue
+
+                    if dst.parent not in made:
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        made.add(dst.parent)
+
+                    if rel.startswith(f"{data_dir.name}/scripts/"):
+                        self._copy_script(src, dst)
+                        records.append(self._record(dst))
+                        continue
+
+                    self._link(src, dst)
+                    if rel in hashes:
+                        records.append((self._relative(dst), *hashes[rel]))
+                    else:
+                        records.append(self._record(dst))
+
+        records.extend(self._entry_points(dist_info / "entry_points.txt", made))
+        with span("install.record", wheel.name):
+            self._write_record(self.site_packages / dist_info.name, records)
+
+        _log.info("Installed %s", wheel.name)
+        return dist_info.name[: -len(".dist-info")]
+
+    def _destination(self, rel: str, data_dir: str) -> Optional[Path]:
+        if rel.endswith((".dist-info/RECORD", ".dist-info/INSTALLER")):
+            # Both get rewritten for this environment.
+            return None
+
+        if not rel.startswith(f"{data_dir}/"):
+            return self.site_packages / rel
+
+        scheme, _, rest = rel[len(data_dir) + 1 :].partition("/")
+        if scheme in ("purelib", "platlib"):
+            return self.site_packages / rest
+        if scheme == "scripts":
+            return self.scripts_dir / rest
+        if scheme == "headers":
+            version = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+            name = data_dir[: -len(".data")].split("-")[0]
+            return self.prefix / "include" / "site" / version / name / rest
+        return self.prefix / rest
+
+    def _link(self, src: Path, dst: Path) -> None:
+        if dst.exists():
+            dst.unlink()
+
+        try:
+            os.link(src, dst)
+        except OSError:
+            # Different filesystem, or one that doesn't do hard links.
+            shutil.copy2(src, dst)
+
+    def _copy_script(self, src: Path, dst: Path) -> None:
+        data = src.read_bytes()
+        if data.startswith(b"#!python"):
+            python = self.scripts_dir / ("python.exe" if os.name == "nt" else "python")
+            data = f"#!{python}".encode() + data[len(b"#!python") :]
+
+        dst.write_bytes(data)
+        dst.chmod(0o755)
+
+    def _entry_points(self, path: Path, made: Set[Path]) -> List[Record]:
+        if not path.is_file():
+            return []
+
+        parser = configparser.ConfigParser(delimiters=("=",))
+        parser.optionxform = str  # type: ignore[assignment, method-assign]
+        parser.read(path)
+
+        if not parser.has_section("console_scripts"):
+            return []
+
+        if self.scripts_dir not in made:
+            self.scripts_dir.mkdir(parents=True, exist_ok=True)
+
+        python = self.scripts_dir / "python"
+        records = []
+
+        for name, target in parser.items("console_scripts"):
+            module, _, func = target.partition(":")
+            func = func.split("[")[0].strip()
+            script = self.scripts_dir / name
+            script.write_text(
+                SCRIPT_TEMPLATE.format(
+                    python=python,
+                    module=module.strip(),
+                    attr=func.split(".")[0],
+                    func=func,
+                )
+            )
+            script.chmod(0o755)
+            records.append(self._record(script))
+
+        return records
+
+    def _remove_existing(self, name: str) -> None:
+        key = normalize_name(name)
+
+        for dist_info in self.site_packages.glob("*.dist-info"):
+            if normalize_name(dist_info.name.split("-")[0]) != key:
+                continue
+
+            _log.info("Removing existing %s", dist_info.name)
+            record = dist_info / "RECORD"
+            if record.is_file():
+                with record.open(newline="") as f:
+                    for row in csv.reader(f):
+                        if row:
+                            (self.site_packages / row[0]).unlink(missing_ok=True)
+
+            shutil.rmtree(dist_info, ignore_errors=True)
+
+    def _wheel_hashes(self, record: Path) -> Dict[str, Tuple[str, str]]:
+        # The wheel already tells us the hash of everything in it, so only
+        # generated files need hashing here.
+        with record.open(newline="") as f:
+            return {row[0]: (row[1], row[2]) for row in csv.reader(f) if row}
+
+    def _relative(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.site_packages)).as_posix()
+
+    def _record(self, path: Path) -> Record:
+        data = path.read_bytes()
+        return self._relative(path), _record_hash(data), str(len(data))
+
+    def _write_record(self, dist_info: Path, records: List[Record]) -> None:
+        installer = dist_info / "INSTALLER"
+        installer.write_text("severn\n")
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows(records)
+        writer.writerow((self._relative(installer), "", ""))
+        writer.writerow((self._relative(dist_info / "RECORD"), "", ""))
+        (dist_info / "RECORD").write_text(buffer.getvalue())
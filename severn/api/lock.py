@@ -0,0 +1,108 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Lockfile",)
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from severn.abc import Representable
+
+LOCK_VERSION = 2
+
+# Lock files pin the top-level dependencies of a requirements file; what
+# those depend on isn't recorded (see Resolver).
+#
+# Universal locks add a top-level "environments" table naming each target
+# with its full set of marker values, and packages that don't apply to (or
+# differ between) every target list the environments they belong to.
+
+
+class Lockfile(Representable):
+    __slots__ = ("pins", "environments", "scoped")
+
+    def __init__(
+        self,
+        pins: Dict[str, str],
+        *,
+        environments: Optional[Mapping[str, Mapping[str, str]]] = None,
+        scoped: Optional[Mapping[str, Mapping[str, str]]] = None,
+    ) -> None:
+        self.pins = pins
+        self.environments = {k: dict(v) for k, v in (environments or {}).items()}
+        self.scoped = {k: dict(v) for k, v in (scoped or {}).items()}
+
+    def pins_for(self, environment: str) -> Dict[str, str]:
+        if environment not in self.environments:
+            raise LookupError(f"no environment named {environment!r} in lock file")
+        return {**self.pins, **self.scoped.get(environment, {})}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Lockfile":
+        with Path(path).open() as f:
+            data: Dict[str, Any] = json.load(f)
+
+        if data.get("version") != LOCK_VERSION:
+            raise ValueError(f"unsupported lock file version: {data.get('version')}")
+
+        pins: Dict[str, str] = {}
+        scoped: Dict[str, Dict[str, str]] = {}
+        for p in data["packages"]:
+            if "environments" not in p:
+                pins[p["name"]] = p["version"]
+                continue
+
+            for env in p["environments"]:
+                scoped.setdefault(env, {})[p["name"]] = p["version"]
+
+        return cls(pins, environments=data.get("environments"), scoped=scoped)
+
+    def dump(self, path: Union[str, Path]) -> None:
+        packages: List[Dict[str, Any]] = [
+            {"name": name, "version": self.pins[name]} for name in sorted(self.pins)
+        ]
+
+        grouped: Dict[Tuple[str, str], List[str]] = {}
+        for env in sorted(self.scoped):
+            for name, version in self.scoped[env].items():
+                grouped.setdefault((name, version), []).append(env)
+
+        packages.extend(
+            {"name": name, "version": version, "environments": envs}
+            for (name, version), envs in sorted(grouped.items())
+        )
+
+        data: Dict[str, Any] = {"version": LOCK_VERSION}
+        if self.environments:
+            data["environments"] = self.environments
+        data["packages"] = packages
+
+        with Path(path).open("w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
@@ -0,0 +1,122 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("default_environment", "evaluate", "parse_target")
+
+import operator
+import os
+import platform
+import re
+import sys
+from functools import lru_cache
+from typing import Callable, Dict, Mapping
+
+from severn.api.constraint import Constraint
+
+# Markers whose values are versions, and so compare as versions rather than
+# strings (PEP 508).
+VERSION_MARKERS = frozenset(
+    {"python_version", "python_full_version", "implementation_version"}
+)
+MARKER_OPERATOR_PATTERN = re.compile(r"(===|==|!=|<=|>=|~=|<|>)(.*)")
+
+STRING_OPERATORS: Dict[str, Callable[[str, str], bool]] = {
+    "===": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+
+def default_environment() -> Dict[str, str]:
+    info = sys.implementation.version
+    implementation_version = f"{info.major}.{info.minor}.{info.micro}"
+    if info.releaselevel != "final":
+        implementation_version += info.releaselevel[0] + str(info.serial)
+
+    return {
+        "implementation_name": sys.implementation.name,
+        "implementation_version": implementation_version,
+        "os_name": os.name,
+        "platform_machine": platform.machine(),
+        "platform_release": platform.release(),
+        "platform_system": platform.system(),
+        "platform_version": platform.version(),
+        "python_full_version": platform.python_version(),
+        "platform_python_implementation": platform.python_implementation(),
+        "python_version": ".".join(platform.python_version_tuple()[:2]),
+        "sys_platform": sys.platform,
+    }
+
+
+def parse_target(raw: str, /) -> Dict[str, str]:
+    # Targets are written as comma-separated key=value marker pairs.
+    target = {}
+
+    for item in raw.split(","):
+        key, sep, value = item.partition("=")
+        if not (sep and key.strip()):
+            raise ValueError(f"invalid target {raw!r} (expected key=value pairs)")
+        target[key.strip()] = value.strip()
+
+    return target
+
+
+@lru_cache(maxsize=1024)
+def _version_marker(expression: str) -> Constraint:
+    return Constraint.from_string(expression)
+
+
+def _evaluate_one(key: str, expression: str, environment: Mapping[str, str]) -> bool:
+    if not (match := MARKER_OPERATOR_PATTERN.fullmatch(expression)):
+        raise ValueError(f"invalid environment marker: {key}{expression}")
+
+    op, expected = match.groups()
+    # PEP 508 says "extra" is the empty string when nothing asked for extras.
+    value = environment.get(key, "")
+
+    if key in VERSION_MARKERS and op != "===":
+        return _version_marker(expression).likes_version(value)
+
+    if op == "~=":
+        raise ValueError(f"~= can only be used with version markers, not {key!r}")
+    return STRING_OPERATORS[op](value, expected)
+
+
+def evaluate(markers: Mapping[str, str], environment: Mapping[str, str]) -> bool:
+    # The parser only accepts markers joined by "and" (or commas), keyed by
+    # marker name with repeated names' expressions comma-separated, so every
+    # one of them must hold.
+    return all(
+        _evaluate_one(k, e, environment)
+        for k, v in markers.items()
+        for e in v.split(",")
+    )
@@ -28,20 +28,43 @@
 
 __all__ = ("RequirementsFile",)
 
+import asyncio
+import codecs
 import logging
 import re
 import warnings
+from collections import deque
 from pathlib import Path
-from typing import Any, List, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import parse_qs, unquote, urljoin, urlsplit
 
 import aiofiles
 
 from severn.abc import Representable
 from severn.api.constraint import Constraint
 from severn.api.dependency import Dependency
-from severn.api.utils import aenumerate
+from severn.api.remote import RemoteFiles, is_url
+from severn.api.utils import project_name
+from severn.tracing import span
 
 ENV_MARKER_PATTERN = re.compile(r"([^<>~=!]+)(.*)")
+MARKER_LITERAL_PATTERN = re.compile(r"(\"[^\"]*\"|'[^']*')")
+MARKER_OPERATOR_PATTERN = re.compile(r"[<>=!~]=?$")
+HASH_OPTION_PATTERN = re.compile(
+    r"\s*--hash[=\s]\s*(?P<algorithm>\w+):(?P<digest>[0-9a-fA-F]+)"
+)
 REQUIREMENT_PATTERN = re.compile(
     r"""
     (?:-r(?P<req_file>.*))?         # Requirements file
@@ -58,14 +81,62 @@ REQUIREMENT_PATTERN = re.compile(
     re.VERBOSE,
 )
 
+# A nested requirements file, and the task parsing it.
+_Include = Tuple["RequirementsFile", "asyncio.Future[List[Dependency]]"]
+
 _log = logging.getLogger(__name__)
 
 
+def _source_key(path: Union[str, Path]) -> str:
+    return path if isinstance(path, str) else str(path.resolve())
+
+
+class _LineJoiner:
+    # pip lets a requirement run over several lines with trailing
+    # backslashes, which is how hash-pinned files are usually laid out.
+    # Remote files arrive a chunk at a time, so this keeps its place between
+    # batches of lines.
+    __slots__ = ("_parts", "_start", "_lineno")
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._start = 0
+        self._lineno = 0
+
+    def feed(self, lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        for line in lines:
+            self._lineno += 1
+            line = line.strip()
+            if not self._parts:
+                self._start = self._lineno
+
+            if line.endswith("\\"):
+                self._parts.append(line[:-1])
+                continue
+
+            self._parts.append(line)
+            yield self._start, " ".join(self._parts).strip()
+            self._parts = []
+
+    def close(self) -> Iterator[Tuple[int, str]]:
+        if self._parts:
+            yield self._start, " ".join(self._parts).strip()
+            self._parts = []
+
+
 class RequirementsFile(Representable):
-    __slots__ = ("path",)
+    __slots__ = ("path", "includes", "_remote", "_parents")
 
-    def __init__(self, path: Union[str, Path]) -> None:
-        self.path = path if isinstance(path, Path) else Path(path)
+    def __init__(
+        self, path: Union[str, Path], *, remote: Optional[RemoteFiles] = None
+    ) -> None:
+        self.path: Union[str, Path] = (
+            path if isinstance(path, Path) or is_url(path) else Path(path)
+        )
+        self.includes: List[Union[str, Path]] = []
+        self._remote = remote
+        # The files that (eventually) included this one, for catching cycles.
+        self._parents: FrozenSet[str] = frozenset()
 
     async def __aenter__(self) -> "RequirementsFile":
         return self
@@ -75,76 +146,268 @@ class RequirementsFile(Representable):
 
     async def parse(self) -> List[Dependency]:
         dependencies: List[Dependency] = []
+        async for batch in self._batches():
+            dependencies.extend(batch)
+        return dependencies
 
-        async with aiofiles.open(self.path) as f:
-            async for i, line in aenumerate(f, start=1):
-                line = line.strip()
+    async def _parse_nested(self) -> List[Dependency]:
+        # Timed from inside the nested file's own task, so this is what
+        # parsing it cost rather than how long its parent waited for it.
+        with span("reqfile.include", self.path):
+            return await self.parse()
 
-                if not line or line.startswith("#"):
-                    # This is quicker and more accurate than making the
-                    # regex handle it.
-                    continue
+    async def iter_dependencies(self) -> AsyncIterator[Dependency]:
+        async for batch in self._batches():
+            for dep in batch:
+                yield dep
 
-                # TODO: Find a more efficient way of doing this.
-                line = line.replace(" ", "")
+    async def _batches(self) -> AsyncIterator[List[Dependency]]:
+        # Dependencies come out in batches, as soon as everything before them
+        # is known; a nested file's whole list is one batch, so deep trees of
+        # includes aren't re-yielded one item at a time at every level.
+        if self._remote:
+            async for batch in self._iter(self._remote):
+                yield batch
+            return
 
-                if not (match := REQUIREMENT_PATTERN.match(line)):
-                    continue
+        # Every remote file in the tree shares one pool of connections.
+        async with RemoteFiles() as remote:
+            async for batch in self._iter(remote):
+                yield batch
 
-                attrs = match.groupdict()
+    async def _iter(self, remote: RemoteFiles) -> AsyncIterator[List[Dependency]]:
+        # Nested files are parsed in the background from the moment their -r
+        # line is seen, so siblings are fetched side by side, and their
+        # dependencies are handed out in the position of that line.
+        queue: Deque[Union[Dependency, _Include]] = deque()
+        joiner = _LineJoiner()
+        self.includes = []
+        count = 0
 
-                if req_file := attrs["req_file"]:
-                    _log.info("Scanning nested requirements file (%s)", req_file)
-                    req_path = Path(req_file)
-                    if not req_path.exists():
-                        req_path = self.path.parent / req_file
-                    dependencies.extend(await RequirementsFile(req_path).parse())
-                    continue
+        try:
+            async for lines in self._read(remote):
+                self._enqueue(joiner.feed(lines), queue, remote)
+                if ready := await self._drain(queue, wait=False):
+                    count += len(ready)
+                    yield ready
 
-                if not attrs["package"]:
-                    warnings.warn(
-                        (
-                            f"cannot resolve requirement at {self.path}:{i} "
-                            "-- probably unsupported format"
-                        ),
-                        stacklevel=999,
-                    )
-                    continue
+            self._enqueue(joiner.close(), queue, remote)
+            if ready := await self._drain(queue, wait=True):
+                count += len(ready)
+                yield ready
+        finally:
+            for item in queue:
+                if not isinstance(item, Dependency):
+                    item[1].cancel()
+
+        _log.info("Found %i dependencies in %s", count, self.path)
+
+    async def _read(self, remote: RemoteFiles) -> AsyncIterator[List[str]]:
+        if not isinstance(self.path, str):
+            with span("reqfile.read", self.path):
+                # One read is far cheaper than a thread round-trip per line.
+                async with aiofiles.open(self.path) as f:
+                    content = await f.read()
+
+            yield content.splitlines()
+            return
 
-                env_markers = {}
-                if attrs["env_markers"]:
-                    for marker in attrs["env_markers"].split(","):
-                        marker = marker.replace("'", "").replace('"', "")
-
-                        if not (match := ENV_MARKER_PATTERN.match(marker)):
-                            continue
-
-                        env_markers[match.group(1)] = match.group(2)
-
-                constraints = v.split(",") if (v := attrs["version"]) else []
-                dependencies.append(
-                    d := Dependency(
-                        name=attrs["package"],
-                        constraints=[Constraint.from_string(c) for c in constraints],
-                        env_markers=env_markers,
-                        extras=e.split(",") if (e := attrs["extras"]) else [],
-                        location=(
-                            attrs["editable"]
-                            or attrs["wheel"]
-                            or attrs["dist_url"]
-                            or attrs["package_url"]
-                        ),
-                        editable=bool(attrs["editable"]),
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+
+        async for chunk in remote.stream(self.path):
+            *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+            yield lines
+
+        yield [pending + decoder.decode(b"", True)]
+
+    def _enqueue(
+        self,
+        lines: Iterable[Tuple[int, str]],
+        queue: Deque[Union[Dependency, _Include]],
+        remote: RemoteFiles,
+    ) -> None:
+        for i, line in lines:
+            if not line or line.startswith("#"):
+                # This is quicker and more accurate than making the
+                # regex handle it.
+                continue
+
+            with span("reqfile.line"):
+                result = self._parse_line(i, line)
+
+            if isinstance(result, str):
+                nested = RequirementsFile(self._include_path(result), remote=remote)
+                nested._parents = self._parents | {_source_key(self.path)}
+                if _source_key(nested.path) in nested._parents:
+                    raise ValueError(
+                        f"circular include at {self.path}:{i} "
+                        f"({nested.path} is already being parsed)"
                     )
+                queue.append((nested, asyncio.ensure_future(nested._parse_nested())))
+            elif result is not None:
+                queue.append(result)
+
+    async def _drain(
+        self, queue: Deque[Union[Dependency, _Include]], *, wait: bool
+    ) -> List[Dependency]:
+        # Takes everything up to the first nested file that isn't ready yet,
+        # or (when waiting) everything.
+        ready: List[Dependency] = []
+
+        while queue:
+            if isinstance(item := queue[0], Dependency):
+                ready.append(item)
+                queue.popleft()
+                continue
+
+            nested, task = item
+            if not (wait or task.done()):
+                break
+
+            ready.extend(await task)
+            queue.popleft()
+            self.includes.extend((nested.path, *nested.includes))
+
+        return ready
+
+    def _include_path(self, target: str) -> Union[str, Path]:
+        _log.info("Scanning nested requirements file (%s)", target)
+
+        if is_url(target):
+            return target
+
+        if isinstance(self.path, str):
+            # Relative to the URL of the file that included it.
+            return urljoin(self.path, target)
+
+        req_path = Path(target)
+        if not req_path.exists():
+            req_path = self.path.parent / target
+        return req_path
+
+    def _split_markers(self, i: int, name: str, raw: str) -> List[str]:
+        # Spaces are gone by now, so "and" can only be told apart from the
+        # names around it where it follows a quoted value. Anything needing
+        # more than a flat list of conditions that must all hold is refused
+        # rather than misread.
+        clauses = [""]
+        parts = MARKER_LITERAL_PATTERN.split(raw)
+
+        for n, part in enumerate(parts):
+            if n % 2:
+                clauses[-1] += part[1:-1]
+                continue
+
+            if n and part.startswith("and"):
+                clauses.append("")
+                part = part[3:]
+
+            if (
+                n
+                and part.startswith("or")
+                or "(" in part
+                or ")" in part
+                # Whatever comes right before a quoted value has to end in a
+                # comparison operator; if not, it's "in", "not in" or a value
+                # on the left.
+                or n + 1 < len(parts)
+                and not MARKER_OPERATOR_PATTERN.search(part.rsplit(",", 1)[-1])
+            ):
+                raise ValueError(
+                    f"unsupported marker expression at {self.path}:{i} "
+                    f"{name}: {raw}"
                 )
 
-                if _log.isEnabledFor(logging.DEBUG):
-                    _log.debug(
-                        "Found dependency %r (constraints = %r) in %s",
-                        d.name,
-                        [c.as_tuple for c in d.constraints],
-                        self.path,
-                    )
+            first, *rest = part.replace('"', "").replace("'", "").split(",")
+            clauses[-1] += first
+            clauses.extend(rest)
 
-        _log.info("Found %i dependencies in %s", len(dependencies), self.path)
-        return dependencies
+        return clauses
+
+    def _parse_line(self, i: int, line: str) -> Union[Dependency, str, None]:
+        # Returns the target of a nested requirements file rather than a
+        # dependency where that's what the line holds.
+        hashes = []
+        if "--hash" in line:
+            hashes = [
+                f"{m['algorithm']}:{m['digest'].lower()}"
+                for m in HASH_OPTION_PATTERN.finditer(line)
+            ]
+            line = HASH_OPTION_PATTERN.sub("", line)
+
+        # TODO: Find a more efficient way of doing this.
+        line = line.replace(" ", "")
+
+        if not (match := REQUIREMENT_PATTERN.match(line)):
+            return None
+
+        attrs = match.groupdict()
+
+        if req_file := attrs["req_file"]:
+            return req_file
+
+        if dist_url := attrs["dist_url"]:
+            # A bare URL swallows the rest of the line, so pull the markers
+            # back off it and take the name from #egg= or the filename.
+            url, _, markers = dist_url.partition(";")
+            parts = urlsplit(url)
+            egg = parse_qs(parts.fragment).get("egg")
+            filename = unquote(parts.path.rsplit("/", 1)[-1])
+            attrs.update(
+                package=egg[0] if egg else project_name(filename),
+                dist_url=url,
+                env_markers=markers or None,
+            )
+
+        if not attrs["package"]:
+            warnings.warn(
+                (
+                    f"cannot resolve requirement at {self.path}:{i} "
+                    "-- probably unsupported format"
+                ),
+                stacklevel=999,
+            )
+            return None
+
+        env_markers: Dict[str, str] = {}
+        if raw_markers := attrs["env_markers"]:
+            for marker in self._split_markers(i, attrs["package"], raw_markers):
+                if not (match := ENV_MARKER_PATTERN.match(marker)):
+                    continue
+
+                # Repeated keys (python_version>="3.8"andpython_version<"4")
+                # keep every expression, comma-separated.
+                key, expression = match.groups()
+                if key in env_markers:
+                    expression = f"{env_markers[key]},{expression}"
+                env_markers[key] = expression
+
+        raw_constraints = v.split(",") if (v := attrs["version"]) else []
+        with span("constraint.from_string"):
+            constraints = [Constraint.from_string(c) for c in raw_constraints]
+
+        d = Dependency(
+            name=attrs["package"],
+            constraints=constraints,
+            env_markers=env_markers,
+            extras=e.split(",") if (e := attrs["extras"]) else [],
+            location=(
+                attrs["editable"]
+                or attrs["wheel"]
+                or attrs["dist_url"]
+                or attrs["package_url"]
+            ),
+            editable=bool(attrs["editable"]),
+            hashes=hashes,
+        )
+
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug(
+                "Found dependency %r (constraints = %r) in %s",
+                d.name,
+                [c.as_tuple() for c in d.constraints],
+                self.path,
+            )
+
+        return d
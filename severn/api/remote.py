@@ -0,0 +1,194 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("RemoteFiles", "is_url")
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional, Set, Union
+
+import aiofiles
+
+from severn.abc import Representable
+from severn.api.utils import cache_dir
+from severn.tracing import span
+
+if TYPE_CHECKING:
+    import aiohttp
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Layout:
+#   <sha256(url)>        the body of the last 200 response
+#   <sha256(url)>.json   the validators that came with it
+
+_log = logging.getLogger(__name__)
+
+
+def is_url(value: Union[str, Path]) -> bool:
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+class RemoteFiles(Representable):
+    __slots__ = (
+        "root",
+        "concurrency",
+        "chunk_size",
+        "_session",
+        "_owns_session",
+        "_locks",
+        "_fresh",
+    )
+
+    def __init__(
+        self,
+        session: Optional["aiohttp.ClientSession"] = None,
+        *,
+        root: Optional[Union[str, Path]] = None,
+        concurrency: int = 8,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.root = Path(root) if root else cache_dir() / "http"
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self._session = session
+        self._owns_session = session is None
+        # One fetch per URL at a time; anyone else asking for it waits and
+        # then reads what that fetch cached, which is good for as long as
+        # this object lives.
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._fresh: Set[str] = set()
+
+    async def __aenter__(self) -> "RemoteFiles":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    def session(self) -> "aiohttp.ClientSession":
+        # Created on first use, so parsing purely local files never pays for
+        # importing aiohttp.
+        if not self._session:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency)
+            )
+        return self._session
+
+    async def stream(self, url: str) -> AsyncIterator[bytes]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        body = self.root / key
+
+        async with self._locks.setdefault(url, asyncio.Lock()):
+            if url in self._fresh:
+                async with aiofiles.open(body, "rb") as f:
+                    yield await f.read()
+                return
+
+            import aiohttp
+
+            try:
+                async for chunk in self._fetch(url, key):
+                    yield chunk
+            except aiohttp.ClientResponseError as exc:
+                if exc.status == 404:
+                    raise FileNotFoundError(f"{url} could not be found") from None
+                raise OSError(f"could not fetch {url}: {exc.message}") from None
+            except aiohttp.ClientError as exc:
+                raise OSError(f"could not fetch {url}: {exc}") from None
+
+    async def _fetch(self, url: str, key: str) -> AsyncIterator[bytes]:
+        body, meta = self.root / key, self.root / f"{key}.json"
+        headers = {}
+
+        if body.is_file() and meta.is_file():
+            validators: Dict[str, str] = json.loads(meta.read_text())
+            if etag := validators.get("etag"):
+                headers["If-None-Match"] = etag
+            if last_modified := validators.get("last_modified"):
+                headers["If-Modified-Since"] = last_modified
+
+        with span("remote.fetch", url):
+            async with self.session().get(url, headers=headers) as r:
+                if r.status == 304:
+                    _log.debug("Using cached copy of %s", url)
+                    async with aiofiles.open(body, "rb") as f:
+                        yield await f.read()
+                    self._fresh.add(url)
+                    return
+
+                r.raise_for_status()
+                validators = {}
+                if etag := r.headers.get("ETag"):
+                    validators["etag"] = etag
+                if last_modified := r.headers.get("Last-Modified"):
+                    validators["last_modified"] = last_modified
+
+                if not validators:
+                    # Nothing to revalidate with, so nothing worth keeping.
+                    async for chunk in r.content.iter_chunked(self.chunk_size):
+                        yield chunk
+                    return
+
+                # Hand each chunk on as it arrives and keep a copy as we go;
+                # the copy is only moved into place once it's complete. Other
+                # processes may be caching the same URL, so every writer gets
+                # a temporary file of its own.
+                self.root.mkdir(parents=True, exist_ok=True)
+                tmp = self._tempfile(key)
+                try:
+                    async with aiofiles.open(tmp, "wb") as f:
+                        async for chunk in r.content.iter_chunked(self.chunk_size):
+                            await f.write(chunk)
+                            yield chunk
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
+
+        tmp.replace(body)
+        tmp = self._tempfile(key)
+        tmp.write_text(json.dumps(validators))
+        tmp.replace(meta)
+        self._fresh.add(url)
+        _log.info("Cached %s", url)
+
+    def _tempfile(self, key: str) -> Path:
+        fd, name = tempfile.mkstemp(prefix=f"{key}.", suffix=".tmp", dir=self.root)
+        os.close(fd)
+        return Path(name)
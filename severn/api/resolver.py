@@ -0,0 +1,223 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Resolver", "merge_dependencies")
+
+import asyncio
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from severn.abc import Representable
+from severn.api.constraint import RELEASE_WIDTH, Constraint
+from severn.api.dependency import Dependency
+from severn.api.index import PackageIndex
+from severn.api.markers import default_environment, evaluate
+from severn.api.utils import normalize_name
+from severn.tracing import span
+
+MarkerKey = FrozenSet[Tuple[str, str]]
+ScopedPins = Dict[str, Dict[str, str]]
+
+_log = logging.getLogger(__name__)
+
+
+def merge_dependencies(dependencies: Iterable[Dependency]) -> Dict[str, Dependency]:
+    merged: Dict[str, Dependency] = {}
+
+    for dep in dependencies:
+        key = normalize_name(dep.name)
+        if not (existing := merged.get(key)):
+            merged[key] = Dependency(
+                name=dep.name,
+                constraints=list(dep.constraints),
+                env_markers=dict(dep.env_markers),
+                extras=list(dep.extras),
+                location=dep.location,
+                editable=dep.editable,
+                hashes=list(dep.hashes),
+            )
+            continue
+
+        existing.constraints.extend(dep.constraints)
+        existing.extras.extend(e for e in dep.extras if e not in existing.extras)
+        existing.hashes.extend(h for h in dep.hashes if h not in existing.hashes)
+        existing.location = existing.location or dep.location
+
+    return merged
+
+
+class Resolver(Representable):
+    # Pins the dependencies it's given and nothing else: Requires-Dist is
+    # never followed, so what comes out (and what lock writes) is top-level
+    # pinning, not a full lock. Anything consuming it has to leave room for
+    # whatever those pins pull in.
+    __slots__ = ("index", "prereleases")
+
+    def __init__(self, index: PackageIndex, *, prereleases: bool = False) -> None:
+        self.index = index
+        self.prereleases = prereleases
+
+    async def resolve(
+        self,
+        dependencies: Iterable[Dependency],
+        environment: Optional[Mapping[str, str]] = None,
+    ) -> Dict[str, str]:
+        # Resolves for one environment -- this interpreter's, unless told
+        # otherwise -- leaving out anything whose markers don't apply to it.
+        environment = environment or default_environment()
+        return await self._resolve(
+            d
+            for d in dependencies
+            if not d.env_markers or evaluate(d.env_markers, environment)
+        )
+
+    async def _resolve(self, dependencies: Iterable[Dependency]) -> Dict[str, str]:
+        with span("resolver.merge"):
+            merged = merge_dependencies(dependencies)
+
+        with span("resolver.fetch"):
+            available = await asyncio.gather(
+                *(self.index.versions(d.name) for d in merged.values())
+            )
+
+        with span("resolver.select"):
+            pins = {
+                key: self.select(dep, versions)
+                for (key, dep), versions in zip(merged.items(), available)
+            }
+        _log.info("Resolved %i dependencies", len(pins))
+        return pins
+
+    async def resolve_universal(
+        self,
+        dependencies: Iterable[Dependency],
+        environments: Mapping[str, Mapping[str, str]],
+    ) -> Tuple[Dict[str, str], ScopedPins]:
+        # Returns the pins shared by every environment, plus the pins that
+        # only apply to (or differ in) each environment.
+        dependencies = list(dependencies)
+        defaults = default_environment()
+        targets = [{**defaults, **env} for env in environments.values()]
+        everywhere = (True,) * len(targets)
+
+        with span("resolver.markers"):
+            # Each distinct marker set is evaluated once per target, however
+            # many dependencies share it.
+            outcomes: Dict[MarkerKey, Tuple[bool, ...]] = {}
+            for dep in dependencies:
+                if (key := frozenset(dep.env_markers.items())) not in outcomes:
+                    outcomes[key] = tuple(evaluate(dep.env_markers, t) for t in targets)
+
+            # Only markers that come out differently between targets split
+            # the resolution; the rest are true or false everywhere.
+            divergent = [k for k, o in outcomes.items() if o != everywhere and any(o)]
+            classes: Dict[Tuple[bool, ...], List[int]] = {}
+            for i in range(len(targets)):
+                signature = tuple(outcomes[k][i] for k in divergent)
+                classes.setdefault(signature, []).append(i)
+
+        split = {
+            normalize_name(d.name)
+            for d in dependencies
+            if (o := outcomes[frozenset(d.env_markers.items())]) != everywhere
+            and any(o)
+        }
+        shared: List[Dependency] = []
+        class_dependencies: List[List[Dependency]] = [[] for _ in classes]
+
+        for dep in dependencies:
+            applies = outcomes[frozenset(dep.env_markers.items())]
+            if normalize_name(dep.name) not in split:
+                if applies == everywhere:
+                    shared.append(dep)
+                continue
+
+            for deps, members in zip(class_dependencies, classes.values()):
+                # Every member of a class agrees, so any one will do.
+                if applies[members[0]]:
+                    deps.append(dep)
+
+        _log.info(
+            "%i divergent markers split %i environments into %i classes",
+            len(divergent),
+            len(targets),
+            len(classes),
+        )
+
+        # The index caches versions by name, so the classes only pay for
+        # selection, and only for the dependencies that actually diverge.
+        common, *per_class = await asyncio.gather(
+            self._resolve(shared), *(self._resolve(d) for d in class_dependencies)
+        )
+
+        for name in split:
+            versions = {p.get(name) for p in per_class}
+            if len(versions) == 1 and (version := versions.pop()):
+                # Same answer everywhere after all.
+                common[name] = version
+                for p in per_class:
+                    del p[name]
+
+        names = list(environments)
+        scoped = {
+            names[i]: pins
+            for members, pins in zip(classes.values(), per_class)
+            for i in members
+        }
+        return common, scoped
+
+    def select(self, dependency: Dependency, versions: List[str]) -> str:
+        prereleases = self.prereleases or any(
+            c.is_prerelease for c in dependency.constraints
+        )
+        best: Optional[Tuple[Tuple[int, ...], str]] = None
+
+        for version in versions:
+            try:
+                candidate = Constraint.from_string(f"=={version}")
+            except ValueError:
+                # Local versions and other non-conforming strings.
+                continue
+
+            if candidate.is_prerelease and not prereleases:
+                continue
+
+            key = candidate.as_tuple(RELEASE_WIDTH)
+            if best and key <= best[0]:
+                continue
+
+            if dependency.likes_version(version):
+                best = (key, version)
+
+        if not best:
+            raise ValueError(
+                f"no available version of {dependency.name!r} satisfies "
+                + (",".join(str(c) for c in dependency.constraints) or "any")
+            )
+
+        return best[1]
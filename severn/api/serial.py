@@ -0,0 +1,158 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = (
+    "aiter_ndjson",
+    "decode_dependency",
+    "dump_json",
+    "dump_ndjson",
+    "encode_dependency",
+    "iter_ndjson",
+    "load_json",
+    "load_ndjson",
+)
+
+import json
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from severn.api.constraint import MAX_VERSION, Constraint
+from severn.api.dependency import Dependency
+
+# Each dependency becomes one JSON object:
+#   {"name": "click", "constraints": [[">=", [8]], ["<", [9], 0, 1]], ...}
+# Constraints are stored field by field -- comparator, release, epoch, alpha,
+# beta, rc, post, dev -- with fields left at their defaults trimmed off the
+# end, so loading them back is a plain constructor call with no regex
+# involved. NDJSON puts one object per line.
+CONSTRAINT_DEFAULTS: Tuple[Any, ...] = (None, None, 0, *([MAX_VERSION] * 5))
+
+# Encoders set up their separators and checks on construction, so reuse one
+# rather than paying for that on every record.
+_encode = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+_decode = json.JSONDecoder().decode
+
+
+def _encode_constraint(c: Constraint) -> List[Any]:
+    fields = [c.comparator, c.release, c.epoch, c.alpha, c.beta, c.rc, c.post, c.dev]
+    while len(fields) > 2 and fields[-1] == CONSTRAINT_DEFAULTS[len(fields) - 1]:
+        fields.pop()
+    return fields
+
+
+def _decode_constraint(fields: List[Any]) -> Constraint:
+    comparator, release, epoch, alpha, beta, rc, post, dev = (
+        *fields,
+        *CONSTRAINT_DEFAULTS[len(fields) :],
+    )
+    return Constraint(
+        comparator,
+        release,
+        epoch=epoch,
+        alpha=alpha,
+        beta=beta,
+        rc=rc,
+        post=post,
+        dev=dev,
+    )
+
+
+def encode_dependency(dep: Dependency) -> Dict[str, Any]:
+    return {
+        "name": dep.name,
+        "constraints": [_encode_constraint(c) for c in dep.constraints],
+        "env_markers": dep.env_markers,
+        "extras": dep.extras,
+        "location": None if dep.location is None else str(dep.location),
+        "editable": dep.editable,
+        "hashes": dep.hashes,
+    }
+
+
+def decode_dependency(data: Dict[str, Any]) -> Dependency:
+    return Dependency(
+        name=data["name"],
+        constraints=[_decode_constraint(c) for c in data["constraints"]],
+        env_markers=data["env_markers"],
+        extras=data["extras"],
+        location=data["location"],
+        editable=data["editable"],
+        hashes=data["hashes"],
+    )
+
+
+def iter_ndjson(dependencies: Iterable[Dependency]) -> Iterator[str]:
+    for dep in dependencies:
+        yield _encode(encode_dependency(dep)) + "\n"
+
+
+async def aiter_ndjson(dependencies: AsyncIterable[Dependency]) -> AsyncIterator[str]:
+    # For feeding straight off RequirementsFile.iter_dependencies(), so the
+    # first lines go out before the whole tree has been parsed.
+    async for dep in dependencies:
+        yield _encode(encode_dependency(dep)) + "\n"
+
+
+def dump_ndjson(dependencies: Iterable[Dependency], fp: IO[str]) -> int:
+    count = 0
+    for line in iter_ndjson(dependencies):
+        fp.write(line)
+        count += 1
+    return count
+
+
+def load_ndjson(fp: Iterable[str]) -> Iterator[Dependency]:
+    for line in fp:
+        if line.strip():
+            yield decode_dependency(_decode(line))
+
+
+def dump_json(dependencies: Iterable[Dependency], fp: IO[str]) -> int:
+    # Written a record at a time rather than built up as one big list.
+    count = 0
+    fp.write("[")
+    for dep in dependencies:
+        if count:
+            fp.write(",")
+        fp.write(_encode(encode_dependency(dep)))
+        count += 1
+    fp.write("]\n")
+    return count
+
+
+def load_json(fp: IO[str]) -> List[Dependency]:
+    return [decode_dependency(d) for d in json.load(fp)]
@@ -0,0 +1,128 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("ContentStore",)
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+from severn.abc import Representable
+from severn.api.utils import cache_dir
+
+# Layout:
+#   sha256/ab/cdef...    artifacts, named by the SHA-256 of their contents
+#   urls/<sha256(url)>   the digest last downloaded from each URL
+#   partial/             downloads in progress
+#   partial/<key>.lock   held by whichever process is writing <key>
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+else:
+    import fcntl
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+class ContentStore(Representable):
+    __slots__ = ("root",)
+
+    def __init__(self, root: Optional[Union[str, Path]] = None) -> None:
+        self.root = Path(root) if root else cache_dir() / "store"
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / "sha256" / digest[:2] / digest[2:]
+
+    def contains(self, digest: str) -> bool:
+        return self.path_for(digest).is_file()
+
+    def partial_path(self, url: str) -> Path:
+        path = self.root / "partial" / _url_key(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def lock_partial(self, url: str) -> Optional[int]:
+        # Partial downloads are shared between processes so they can be
+        # resumed, which means only one process may write to each at a
+        # time. Returns a descriptor holding the lock (closing it releases
+        # the lock), or None if someone else has it.
+        path = self.partial_path(url).with_suffix(".lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if _try_lock(fd):
+            return fd
+
+        os.close(fd)
+        return None
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        try:
+            digest = (self.root / "urls" / _url_key(url)).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+        return digest if self.contains(digest) else None
+
+    def add(self, path: Path, digest: str) -> Path:
+        target = self.path_for(digest)
+
+        if target.is_file():
+            # Someone else got there first -- the contents are identical.
+            path.unlink()
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Renames within a filesystem are atomic, so readers never see a
+        # half-written artifact.
+        path.replace(target)
+        return target
+
+    def remember(self, url: str, digest: str) -> None:
+        path = self.root / "urls" / _url_key(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}")
+        tmp.write_text(digest)
+        tmp.replace(path)
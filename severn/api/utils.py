@@ -26,12 +26,19 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-__all__ = ("aenumerate",)
+__all__ = ("aenumerate", "cache_dir", "normalize_name", "project_name")
 
-from typing import AsyncIterable, AsyncIterator, Tuple, TypeVar
+import os
+import re
+import sys
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional, Tuple, TypeVar
 
 T = TypeVar("T")
 
+NAME_SEPARATOR_PATTERN = re.compile(r"[-_.]+")
+ARTIFACT_EXTENSIONS = (".whl", ".tar.gz", ".zip")
+
 
 async def aenumerate(
     sequence: AsyncIterable[T], start: int = 0
@@ -40,3 +47,32 @@ async def aenumerate(
     async for i in sequence:
         yield n, i
         n += 1
+
+
+def normalize_name(name: str, /) -> str:
+    return NAME_SEPARATOR_PATTERN.sub("-", name).lower()
+
+
+def project_name(filename: str, /) -> Optional[str]:
+    if filename.endswith(".whl"):
+        return normalize_name(filename.split("-")[0])
+
+    for ext in ARTIFACT_EXTENSIONS[1:]:
+        if filename.endswith(ext):
+            return normalize_name(filename[: -len(ext)].rsplit("-", 1)[0])
+
+    return None
+
+
+def cache_dir() -> Path:
+    if override := os.environ.get("SEVERN_CACHE_DIR"):
+        return Path(override)
+
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData/Local"))
+        return base / "severn" / "Cache"
+
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "severn"
+
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "severn"
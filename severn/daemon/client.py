@@ -0,0 +1,181 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("DaemonClient",)
+
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from severn.abc import Representable
+from severn.api.dependency import Dependency
+from severn.api.markers import default_environment
+from severn.daemon.protocol import (
+    check_socket_dir,
+    decode_dependency,
+    default_socket_path,
+)
+
+SPAWN_TIMEOUT = 5.0
+REMOTE_EXCEPTIONS = {
+    e.__name__: e for e in (FileNotFoundError, LookupError, ValueError)
+}
+
+
+class DaemonClient(Representable):
+    __slots__ = ("path", "spawn", "timeout", "_sock", "_rfile")
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        *,
+        spawn: bool = True,
+        timeout: float = 60.0,
+    ) -> None:
+        self.path = Path(path) if path else default_socket_path()
+        self.spawn = spawn
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._rfile: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "DaemonClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _connect(self) -> socket.socket:
+        check_socket_dir(self.path.parent)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+
+        sock.settimeout(self.timeout)
+        return sock
+
+    def _spawn(self) -> socket.socket:
+        args = [sys.executable, "-m", "severn", "daemon", "start", "-s", str(self.path)]
+        subprocess.Popen(
+            args,  # noqa: S603
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        deadline = time.monotonic() + SPAWN_TIMEOUT
+        while True:
+            try:
+                return self._connect()
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise ConnectionError(
+                        f"timed out waiting for the daemon to start at {self.path}"
+                    ) from None
+                time.sleep(0.01)
+
+    def connect(self) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("the daemon is not supported on this platform")
+
+        try:
+            self._sock = self._connect()
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not self.spawn:
+                raise
+            self._sock = self._spawn()
+
+        self._rfile = self._sock.makefile("rb")
+
+    def close(self) -> None:
+        if self._rfile:
+            self._rfile.close()
+            self._rfile = None
+
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def request(self, command: str, /, **kwargs: Any) -> Any:
+        if not (self._sock and self._rfile):
+            raise RuntimeError("the client must be connected before making requests")
+
+        self._sock.sendall(json.dumps({"command": command, **kwargs}).encode() + b"\n")
+        if not (line := self._rfile.readline()):
+            raise ConnectionError("the daemon closed the connection")
+
+        response: Dict[str, Any] = json.loads(line)
+        if not response["ok"]:
+            exc_type = REMOTE_EXCEPTIONS.get(response["type"], RuntimeError)
+            raise exc_type(response["error"])
+
+        return response["result"]
+
+    def ping(self) -> Dict[str, Any]:
+        return self.request("ping")  # type: ignore[no-any-return]
+
+    def shutdown(self) -> None:
+        self.request("shutdown")
+
+    def parse(self, path: Union[str, Path]) -> List[Dependency]:
+        result = self.request("parse", path=str(Path(path).resolve()))
+        return [decode_dependency(d) for d in result]
+
+    def check(
+        self, path: Union[str, Path]
+    ) -> Tuple[int, List[Tuple[Dependency, Optional[str]]]]:
+        # The daemon may be running under another interpreter entirely, so
+        # it's told about ours: where to look, and what markers to apply.
+        result = self.request(
+            "check",
+            path=str(Path(path).resolve()),
+            paths=[p for p in sys.path if p],
+            environment=default_environment(),
+        )
+        return result["total"], [
+            (decode_dependency(d), v) for d, v in result["unsatisfied"]
+        ]
+
+    def resolve(
+        self, path: Union[str, Path], index_url: str, prereleases: bool
+    ) -> Dict[str, str]:
+        return self.request(  # type: ignore[no-any-return]
+            "resolve",
+            path=str(Path(path).resolve()),
+            index_url=index_url,
+            prereleases=prereleases,
+            environment=default_environment(),
+        )
@@ -0,0 +1,69 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = (
+    "check_socket_dir",
+    "decode_dependency",
+    "default_socket_path",
+    "encode_dependency",
+)
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from severn.api.serial import decode_dependency, encode_dependency
+
+# Requests and responses are single JSON objects, one per line.
+#   -> {"command": "parse", "path": "/abs/requirements.txt"}
+#   <- {"ok": true, "result": [...]}
+#   <- {"ok": false, "error": "...", "type": "ValueError"}
+
+
+def default_socket_path() -> Path:
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(runtime_dir, "severn.sock")
+
+    # The per-user directory is created with 0700 permissions by the daemon,
+    # so nobody else can talk to it through a shared temp directory.
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir(), f"severn-{uid}", "severn.sock")
+
+
+def check_socket_dir(directory: Path) -> None:
+    # The fallback lives in a world-writable temp directory, so someone else
+    # could have made it first and be waiting to impersonate the daemon.
+    st = directory.stat()
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise PermissionError(f"{directory} is not owned by the current user")
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        raise PermissionError(
+            f"{directory} is accessible to other users "
+            f"(mode {stat.S_IMODE(st.st_mode):o}, expected 700)"
+        )
@@ -0,0 +1,255 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Daemon",)
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from severn.abc import Representable
+from severn.api.dependency import Dependency
+from severn.api.environment import installed_versions, unsatisfied
+from severn.api.index import PackageIndex
+from severn.api.parsers import RequirementsFile
+from severn.api.remote import is_url
+from severn.api.resolver import Resolver
+from severn.daemon.protocol import (
+    check_socket_dir,
+    default_socket_path,
+    encode_dependency,
+)
+from severn.tracing import span
+
+DEFAULT_IDLE_TIMEOUT = 900.0
+# How long the versions an index has told us about are trusted for, so a
+# long-lived daemon still notices new releases.
+INDEX_TTL = 300.0
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+_log = logging.getLogger(__name__)
+
+
+def _signature(paths: Iterable[Union[str, Path]]) -> Signature:
+    signature = []
+
+    for path in paths:
+        try:
+            st = Path(path).stat()
+        except OSError:
+            continue
+        signature.append((str(path), st.st_mtime_ns, st.st_size))
+
+    return tuple(signature)
+
+
+class Daemon(Representable):
+    __slots__ = (
+        "path",
+        "idle_timeout",
+        "_files",
+        "_encoded",
+        "_indexes",
+        "_started",
+        "_last_request",
+        "_requests",
+        "_stop",
+    )
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        *,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self.path = Path(path) if path else default_socket_path()
+        self.idle_timeout = idle_timeout
+        self._files: Dict[str, Tuple[Signature, List[Dependency]]] = {}
+        self._encoded: Dict[str, List[Dict[str, Any]]] = {}
+        self._indexes: Dict[str, Tuple[float, PackageIndex]] = {}
+        self._started = self._last_request = time.monotonic()
+        self._requests = 0
+        self._stop: Optional[asyncio.Event] = None
+
+    def _is_listening(self) -> bool:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self.path))
+            except OSError:
+                return False
+            return True
+
+    async def serve(self) -> None:
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        check_socket_dir(self.path.parent)
+
+        if self._is_listening():
+            raise RuntimeError(f"a daemon is already listening on {self.path}")
+
+        with contextlib.suppress(FileNotFoundError):
+            # Left behind by a daemon that didn't shut down cleanly.
+            self.path.unlink()
+
+        self._stop = asyncio.Event()
+        server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        self.path.chmod(0o600)
+        watcher = asyncio.create_task(self._watch_idle())
+        _log.info("Daemon listening on %s (pid %i)", self.path, os.getpid())
+
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            watcher.cancel()
+            for _, index in self._indexes.values():
+                await index.__aexit__()
+            with contextlib.suppress(FileNotFoundError):
+                self.path.unlink()
+            _log.info("Daemon stopped after %i requests", self._requests)
+
+    def stop(self) -> None:
+        if self._stop:
+            self._stop.set()
+
+    async def _watch_idle(self) -> None:
+        while True:
+            remaining = self._last_request + self.idle_timeout - time.monotonic()
+            if remaining <= 0:
+                _log.info("Idle for %.0f seconds, shutting down", self.idle_timeout)
+                self.stop()
+                return
+            await asyncio.sleep(remaining)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                writer.write(json.dumps(await self._dispatch(line)).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled means we're shutting down with this client still
+            # connected, which isn't worth a traceback.
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line: bytes) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self._last_request = time.monotonic()
+        self._requests += 1
+
+        try:
+            request: Dict[str, Any] = json.loads(line)
+            command = request.pop("command")
+            if not (handler := getattr(self, f"_cmd_{command}", None)):
+                raise ValueError(f"unknown command: {command!r}")
+            with span(f"daemon.{command}"):
+                response = {"ok": True, "result": await handler(**request)}
+        except Exception as exc:  # noqa: BLE001
+            _log.debug("Request failed", exc_info=True)
+            response = {"ok": False, "error": str(exc), "type": type(exc).__name__}
+
+        _log.debug("Served request in %.2f ms", (time.perf_counter() - start) * 1000)
+        return response
+
+    async def _dependencies(self, path: str) -> List[Dependency]:
+        if cached := self._files.get(path):
+            signature, dependencies = cached
+            if _signature(p for p, *_ in signature) == signature:
+                return dependencies
+
+        reqs = RequirementsFile(path)
+        dependencies = await reqs.parse()
+        self._encoded.pop(path, None)
+
+        if any(is_url(p) for p in reqs.includes):
+            # There's no mtime to watch for remote includes, so parse again
+            # each time; the HTTP cache makes that a round of 304s.
+            self._files.pop(path, None)
+        else:
+            self._files[path] = (_signature((path, *reqs.includes)), dependencies)
+        return dependencies
+
+    async def _cmd_ping(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime": time.monotonic() - self._started,
+            "requests": self._requests,
+            "files": len(self._files),
+        }
+
+    async def _cmd_shutdown(self) -> None:
+        self.stop()
+
+    async def _cmd_parse(self, path: str) -> List[Dict[str, Any]]:
+        dependencies = await self._dependencies(path)
+        if (encoded := self._encoded.get(path)) is None:
+            encoded = self._encoded[path] = [encode_dependency(d) for d in dependencies]
+        return encoded
+
+    async def _cmd_check(
+        self, path: str, paths: List[str], environment: Dict[str, str]
+    ) -> Dict[str, Any]:
+        dependencies = await self._dependencies(path)
+        problems = unsatisfied(dependencies, installed_versions(paths), environment)
+        return {
+            "total": len(dependencies),
+            "unsatisfied": [[encode_dependency(d), v] for d, v in problems],
+        }
+
+    async def _cmd_resolve(
+        self,
+        path: str,
+        index_url: str,
+        prereleases: bool,
+        environment: Dict[str, str],
+    ) -> Dict[str, str]:
+        dependencies = await self._dependencies(path)
+
+        now = time.monotonic()
+        if cached := self._indexes.get(index_url):
+            opened, index = cached
+            if now - opened > INDEX_TTL:
+                # Keep the session, but forget what versions exist.
+                index.clear()
+                self._indexes[index_url] = (now, index)
+        else:
+            index = await PackageIndex(index_url).__aenter__()
+            self._indexes[index_url] = (now, index)
+
+        return await Resolver(index, prereleases=prereleases).resolve(
+            dependencies, environment
+        )
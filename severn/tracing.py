@@ -0,0 +1,182 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("Span", "Tracer", "disable", "enable", "span")
+
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from severn.abc import Representable
+
+# When tracing is disabled, `span()` hands back the same do-nothing context
+# manager every time, so instrumented code pays for a global lookup and a
+# function call and nothing else.
+
+
+class Span(Representable):
+    __slots__ = ("name", "detail", "start", "duration", "context")
+
+    def __init__(
+        self, name: str, detail: object, start: int, duration: int, context: int
+    ) -> None:
+        self.name = name
+        self.detail = detail
+        self.start = start
+        self.duration = duration
+        self.context = context
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        return None
+
+
+class _ActiveSpan:
+    __slots__ = ("_tracer", "_name", "_detail", "_start")
+
+    def __init__(self, tracer: "Tracer", name: str, detail: object) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._detail = detail
+        self._start = 0
+
+    def __enter__(self) -> "_ActiveSpan":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        end = time.perf_counter_ns()
+        self._tracer.spans.append(
+            Span(self._name, self._detail, self._start, end - self._start, _context())
+        )
+
+
+def _context() -> int:
+    # Coroutines interleave on one thread, so use the task as the "thread" to
+    # stop concurrent spans being drawn as if they were nested.
+    if asyncio := sys.modules.get("asyncio"):
+        try:
+            if task := asyncio.current_task():
+                return id(task)
+        except RuntimeError:
+            pass
+
+    return threading.get_ident()
+
+
+def _percentile(values: List[int], pct: float) -> int:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(len(ordered) * pct) - 1, 0)]
+
+
+class Tracer(Representable):
+    __slots__ = ("spans",)
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        origin = min((s.start for s in self.spans), default=0)
+        contexts: Dict[int, int] = {}
+        events = []
+
+        for s in self.spans:
+            event: Dict[str, Any] = {
+                "name": s.name,
+                "ph": "X",
+                "ts": (s.start - origin) / 1000,
+                "dur": s.duration / 1000,
+                "pid": 1,
+                "tid": contexts.setdefault(s.context, len(contexts) + 1),
+            }
+            if s.detail is not None:
+                event["args"] = {"detail": str(s.detail)}
+            events.append(event)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path: Union[str, Path]) -> None:
+        import json
+
+        with Path(path).open("w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self) -> List[Tuple[str, int, float, float]]:
+        durations: Dict[str, List[int]] = {}
+        for s in self.spans:
+            durations.setdefault(s.name, []).append(s.duration)
+
+        rows = [
+            (name, len(d), sum(d) / 1e6, _percentile(d, 0.95) / 1e6)
+            for name, d in durations.items()
+        ]
+        return sorted(rows, key=lambda r: r[2], reverse=True)
+
+    def format_summary(self) -> str:
+        rows = self.summary()
+        width = max((len(r[0]) for r in rows), default=5)
+        lines = [f"{'stage':<{width}}  {'count':>9}  {'total ms':>11}  {'p95 ms':>9}"]
+        lines.extend(
+            f"{name:<{width}}  {count:>9,}  {total:>11.3f}  {p95:>9.3f}"
+            for name, count, total, p95 in rows
+        )
+        return "\n".join(lines)
+
+
+_tracer: Optional[Tracer] = None
+_NULL_SPAN = _NullSpan()
+
+
+def enable() -> Tracer:
+    global _tracer
+
+    if not _tracer:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    global _tracer
+
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def span(name: str, detail: object = None) -> Union[_NullSpan, _ActiveSpan]:
+    if _tracer is None:
+        return _NULL_SPAN
+    return _ActiveSpan(_tracer, name, detail)
@@ -0,0 +1,673 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+__all__ = ("cli", "main")
+
+# Keep the imports here to the bare minimum -- everything heavier than click
+# is imported inside the command that needs it so that `severn --help` and
+# friends start instantly. `nox -s startup` keeps us honest.
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import click
+
+from severn import __version__
+
+if TYPE_CHECKING:
+    from severn.api.dependency import Dependency
+    from severn.api.lock import Lockfile
+
+BANNER = """
+     ###########     #########  ####       ###    ##########   ###########    ##########
+  ####            ####         ####       ###  ####           ###      ####  ####     ####
+   ##########   ############   ####      ###  ############   ###      ####  ###      ####
+          ####  ####            ###     ###   ####          ##########     ####     ####
+############     ##########      #########     ##########  ####     ###   ####     ####
+"""  # noqa: E501
+SCAN_SKIP_DIRS = frozenset({"__pycache__", "node_modules", "site-packages", "venv"})
+
+FilePath = click.Path(exists=True, dir_okay=False, path_type=Path)
+
+
+def _format_dependency(dep: "Dependency") -> str:
+    line = dep.name
+    if dep.extras:
+        line += f"[{','.join(dep.extras)}]"
+    line += ",".join(str(c) for c in dep.constraints)
+    if dep.location:
+        line += f" @ {dep.location}"
+    if dep.env_markers:
+        line += "; " + " and ".join(
+            f"{k}{e}" for k, v in dep.env_markers.items() for e in v.split(",")
+        )
+    for h in dep.hashes:
+        line += f" --hash={h}"
+    return line
+
+
+def _parse(*paths: Path) -> List[List["Dependency"]]:
+    import asyncio
+
+    from severn.api.parsers import RequirementsFile
+
+    async def parse() -> List[List["Dependency"]]:
+        return await asyncio.gather(*(RequirementsFile(p).parse() for p in paths))
+
+    # Failed includes, local or remote, surface as OSErrors.
+    try:
+        return asyncio.run(parse())
+    except (OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+
+def _resolve(path: Path, index_url: str, prereleases: bool) -> Dict[str, str]:
+    import asyncio
+
+    import aiohttp
+
+    from severn.api.index import PackageIndex
+    from severn.api.parsers import RequirementsFile
+    from severn.api.resolver import Resolver
+
+    async def resolve() -> Dict[str, str]:
+        dependencies = await RequirementsFile(path).parse()
+        async with PackageIndex(index_url) as index:
+            return await Resolver(index, prereleases=prereleases).resolve(dependencies)
+
+    try:
+        return asyncio.run(resolve())
+    except (aiohttp.ClientError, LookupError, OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+
+def _resolve_universal(
+    path: Path, targets: Iterable[str], index_url: str, prereleases: bool
+) -> "Lockfile":
+    import asyncio
+
+    import aiohttp
+
+    from severn.api.index import PackageIndex
+    from severn.api.lock import Lockfile
+    from severn.api.markers import default_environment, parse_target
+    from severn.api.parsers import RequirementsFile
+    from severn.api.resolver import Resolver
+
+    async def resolve() -> Lockfile:
+        # Targets only name the markers that differ from this interpreter;
+        # the lock records everything they were resolved against.
+        defaults = default_environment()
+        environments = {t: {**defaults, **parse_target(t)} for t in targets}
+        dependencies = await RequirementsFile(path).parse()
+        async with PackageIndex(index_url) as index:
+            pins, scoped = await Resolver(
+                index, prereleases=prereleases
+            ).resolve_universal(dependencies, environments)
+        return Lockfile(pins, environments=environments, scoped=scoped)
+
+    try:
+        return asyncio.run(resolve())
+    except (aiohttp.ClientError, LookupError, OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+
+def _from_daemon(method: str, *args: Any) -> Any:
+    from severn.daemon import DaemonClient
+
+    try:
+        with DaemonClient() as client:
+            return getattr(client, method)(*args)
+    except (LookupError, OSError, RuntimeError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+
+def _find_requirements_files(root: Path) -> Iterator[Path]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d for d in dirnames if not d.startswith(".") and d not in SCAN_SKIP_DIRS
+        ]
+        in_requirements_dir = Path(dirpath).name == "requirements"
+
+        for filename in sorted(filenames):
+            if filename.endswith(".txt") and (
+                in_requirements_dir or "requirements" in filename
+            ):
+                yield Path(dirpath, filename)
+
+
+index_option = click.option(
+    "--index-url",
+    default="https://pypi.org/simple",
+    show_default=True,
+    help="The base URL of the package index to resolve against.",
+)
+pre_option = click.option(
+    "--pre", is_flag=True, help="Consider pre-release and development versions."
+)
+daemon_option = click.option(
+    "-d",
+    "--daemon",
+    "use_daemon",
+    is_flag=True,
+    envvar="SEVERN_DAEMON",
+    help="Serve the request from the background daemon, starting it if needed.",
+)
+socket_option = click.option(
+    "-s",
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="The daemon's Unix socket. Defaults to a per-user path.",
+)
+
+
+@click.group(invoke_without_command=True)
+@click.version_option(__version__, prog_name="Severn")
+@click.option(
+    "--trace",
+    "trace_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write a Chrome trace (chrome://tracing, Perfetto) to this file.",
+)
+@click.option(
+    "--trace-summary", is_flag=True, help="Print time spent per stage when done."
+)
+@click.pass_context
+def cli(ctx: click.Context, trace_path: Optional[Path], trace_summary: bool) -> None:
+    """Your new end-to-end project management system."""
+
+    if trace_path or trace_summary:
+        from severn import tracing
+
+        tracer = tracing.enable()
+
+        def report() -> None:
+            if trace_path:
+                tracer.dump_chrome_trace(trace_path)
+            if trace_summary:
+                click.echo(tracer.format_summary(), err=True)
+
+        ctx.call_on_close(report)
+
+    if ctx.invoked_subcommand is None:
+        click.echo(f"{BANNER}\nSevern v{__version__}\n")
+        click.echo(ctx.get_help())
+
+
+def _stream_ndjson(path: Path) -> None:
+    import asyncio
+
+    from severn.api.parsers import RequirementsFile
+    from severn.api.serial import aiter_ndjson
+
+    async def stream() -> None:
+        # Lines go out as the parser produces them, not once it's finished.
+        async for line in aiter_ndjson(RequirementsFile(path).iter_dependencies()):
+            click.echo(line, nl=False)
+
+    try:
+        asyncio.run(stream())
+    except (OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+
+@cli.command()
+@click.argument("file", type=FilePath)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json", "ndjson"]),
+    default="text",
+    show_default=True,
+    help="How to print the dependencies.",
+)
+@daemon_option
+def parse(file: Path, output_format: str, use_daemon: bool) -> None:
+    """Parse a requirements file and list its dependencies."""
+
+    if output_format == "ndjson" and not use_daemon:
+        _stream_ndjson(file)
+        return
+
+    dependencies = _from_daemon("parse", file) if use_daemon else _parse(file)[0]
+
+    if output_format == "text":
+        for dep in dependencies:
+            click.echo(_format_dependency(dep))
+        return
+
+    import sys
+
+    from severn.api import serial
+
+    if output_format == "json":
+        serial.dump_json(dependencies, sys.stdout)
+    else:
+        serial.dump_ndjson(dependencies, sys.stdout)
+
+
+@cli.command()
+@click.argument("file", type=FilePath)
+@daemon_option
+@click.pass_context
+def check(ctx: click.Context, file: Path, use_daemon: bool) -> None:
+    """Check the current environment satisfies a requirements file."""
+
+    if use_daemon:
+        total, problems = _from_daemon("check", file)
+    else:
+        from severn.api.environment import installed_versions, unsatisfied
+
+        dependencies = _parse(file)[0]
+        try:
+            problems = unsatisfied(dependencies, installed_versions())
+        except ValueError as exc:
+            # Markers the parser let through but that can't be evaluated.
+            raise click.ClickException(str(exc)) from None
+        total = len(dependencies)
+
+    for dep, installed in problems:
+        if not installed:
+            click.echo(f"{dep.name}: not installed")
+            continue
+
+        wanted = ",".join(str(c) for c in dep.constraints)
+        click.echo(f"{dep.name}: {installed} installed, wanted {wanted}")
+
+    if problems:
+        click.echo(f"{len(problems):,} of {total:,} dependencies unsatisfied")
+        ctx.exit(1)
+
+    click.echo(f"All {total:,} dependencies satisfied")
+
+
+@cli.command()
+@click.argument("before", type=FilePath)
+@click.argument("after", type=FilePath)
+@click.option(
+    "-a", "--all", "show_all", is_flag=True, help="Include unchanged dependencies."
+)
+def diff(before: Path, after: Path, show_all: bool) -> None:
+    """Compare the dependencies of two requirements files."""
+
+    from severn.api.diff import UNCHANGED, diff_requirements
+
+    old, new = _parse(before, after)
+
+    for change in diff_requirements(old, new):
+        if change.kind == UNCHANGED and not show_all:
+            continue
+
+        line = f"{change.name}: {change.kind}"
+        if change.before and change.after:
+            was = ",".join(str(c) for c in change.before.constraints) or "any"
+            now = ",".join(str(c) for c in change.after.constraints) or "any"
+            line += f" ({was} -> {now})"
+        click.echo(line)
+
+
+@cli.command()
+@click.argument("lockfile", type=FilePath)
+@click.option(
+    "-e",
+    "--environment",
+    help="Which of a universal lock file's environments to plan for.",
+)
+@click.option(
+    "--keep-extraneous",
+    is_flag=True,
+    help="Don't plan to remove packages the lock file doesn't mention.",
+)
+@click.option(
+    "--venv",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="The virtual environment to plan for (defaults to this one).",
+)
+def plan(
+    lockfile: Path,
+    environment: Optional[str],
+    keep_extraneous: bool,
+    venv: Optional[Path],
+) -> None:
+    """List the operations needed to bring an environment in line with a lock."""
+
+    from severn.api import diff
+    from severn.api.environment import requirement_closure, snapshot
+    from severn.api.install import site_packages
+    from severn.api.lock import Lockfile
+
+    try:
+        lock = Lockfile.load(lockfile)
+        pins = lock.pins_for(environment) if environment else lock.pins
+        installed = snapshot([str(site_packages(venv))] if venv else None)
+    except (LookupError, OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+    operations = diff.plan(
+        pins,
+        {name: dist.version for name, dist in installed.items()},
+        remove_extraneous=not keep_extraneous,
+        # Locks only pin top-level dependencies, so what those require has to
+        # stay; and removing severn's own dependencies would break the next
+        # run.
+        keep=requirement_closure(diff.PROTECTED, installed)
+        | requirement_closure(pins, installed),
+    )
+
+    for op in operations:
+        if op.action == diff.INSTALL:
+            click.echo(f"install {op.name}=={op.target}")
+        elif op.action == diff.REMOVE:
+            click.echo(f"remove {op.name}=={op.current}")
+        else:
+            click.echo(f"{op.action} {op.name} {op.current} -> {op.target}")
+
+    click.echo(f"{len(operations):,} operations needed")
+
+
+@cli.command()
+@click.argument("file", type=FilePath)
+@index_option
+@pre_option
+@daemon_option
+def resolve(file: Path, index_url: str, pre: bool, use_daemon: bool) -> None:
+    """Pin a requirements file's top-level dependencies (not what they require)."""
+
+    if use_daemon:
+        pins = _from_daemon("resolve", file, index_url, pre)
+    else:
+        pins = _resolve(file, index_url, pre)
+
+    for name, version in sorted(pins.items()):
+        click.echo(f"{name}=={version}")
+
+
+@cli.command()
+@click.argument("file", type=FilePath)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="severn.lock",
+    show_default=True,
+    help="Where to write the lock file.",
+)
+@click.option(
+    "-t",
+    "--target",
+    "targets",
+    multiple=True,
+    metavar="KEY=VALUE,...",
+    help=(
+        "Lock for an environment described by marker values, e.g. "
+        "python_version=3.8,platform_machine=aarch64. Repeat to write one lock "
+        "covering several; unset markers take this interpreter's values."
+    ),
+)
+@index_option
+@pre_option
+@daemon_option
+def lock(
+    file: Path,
+    output: Path,
+    targets: Tuple[str, ...],
+    index_url: str,
+    pre: bool,
+    use_daemon: bool,
+) -> None:
+    """Pin a requirements file's top-level dependencies in a lock file."""
+
+    from severn.api.lock import Lockfile
+
+    if targets:
+        lockfile = _resolve_universal(file, targets, index_url, pre)
+        lockfile.dump(output)
+        click.echo(
+            f"Locked {len(lockfile.pins):,} shared and "
+            f"{len({n for p in lockfile.scoped.values() for n in p}):,} "
+            f"environment-specific top-level dependencies for {len(targets):,} "
+            f"environments in {output}"
+        )
+        return
+
+    if use_daemon:
+        pins = _from_daemon("resolve", file, index_url, pre)
+    else:
+        pins = _resolve(file, index_url, pre)
+
+    Lockfile(pins).dump(output)
+    click.echo(f"Locked {len(pins):,} top-level dependencies in {output}")
+
+
+@cli.command()
+@click.argument("file", type=FilePath)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="How many artifacts to download at once.",
+)
+def download(file: Path, jobs: int) -> None:
+    """Download the artifacts a requirements file points at."""
+
+    import asyncio
+
+    import aiohttp
+
+    from severn.api.download import Artifact, Downloader
+    from severn.api.parsers import RequirementsFile
+
+    async def fetch() -> Dict[str, Artifact]:
+        dependencies = await RequirementsFile(file).parse()
+        async with Downloader(concurrency=jobs) as downloader:
+            return await downloader.fetch_dependencies(dependencies)
+
+    try:
+        artifacts = asyncio.run(fetch())
+    except (aiohttp.ClientError, OSError, ValueError) as exc:
+        raise click.ClickException(str(exc)) from None
+
+    for name, artifact in artifacts.items():
+        click.echo(f"{name}: {artifact.path} (sha256:{artifact.sha256})")
+
+
+@cli.command()
+@click.argument(
+    "wheels",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, path_type=Path),
+)
+@click.option(
+    "--venv",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=".venv",
+    show_default=True,
+    help="The virtual environment to install into.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="How many wheels to install at once.",
+)
+def install(wheels: List[Path], venv: Path, jobs: Optional[int]) -> None:
+    """Install wheels (or directories of them) into a virtual environment."""
+
+    import zipfile
+
+    from severn.api.install import Installer
+
+    paths = [
+        w for p in wheels for w in (sorted(p.glob("*.whl")) if p.is_dir() else [p])
+    ]
+
+    try:
+        installed = Installer(venv, workers=jobs).install(paths)
+    except (OSError, ValueError, zipfile.BadZipFile) as exc:
+        raise click.ClickException(str(exc)) from None
+
+    click.echo(f"Installed {len(installed):,} packages into {venv}")
+
+
+@cli.command()
+@click.argument("file", type=FilePath)
+@click.argument(
+    "wheelhouse", type=click.Path(exists=True, file_okay=False, path_type=Path)
+)
+@click.pass_context
+def verify(ctx: click.Context, file: Path, wheelhouse: Path) -> None:
+    """Check a directory of artifacts against a file's --hash options."""
+
+    from severn.api.hashing import HashVerifier
+
+    try:
+        results = HashVerifier().verify_wheelhouse(wheelhouse, _parse(file)[0])
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from None
+
+    failed = 0
+
+    for path, ok in results.items():
+        if not ok:
+            failed += 1
+            reason = "no hashes to check against" if ok is None else "hash mismatch"
+            click.echo(f"{path.name}: {reason}")
+
+    if failed:
+        click.echo(f"{failed:,} of {len(results):,} artifacts failed verification")
+        ctx.exit(1)
+
+    click.echo(f"All {len(results):,} artifacts verified")
+
+
+@cli.command()
+@click.argument(
+    "directory",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=".",
+)
+def scan(directory: Path) -> None:
+    """Find and parse every requirements file in a project."""
+
+    if not (paths := list(_find_requirements_files(directory))):
+        click.echo(f"No requirements files found in {directory}")
+        return
+
+    results = _parse(*paths)
+    for path, dependencies in zip(paths, results):
+        click.echo(f"{path}: {len(dependencies):,} dependencies")
+
+    total = sum(len(r) for r in results)
+    click.echo(f"Found {total:,} dependencies in {len(paths):,} files")
+
+
+@cli.group()
+def daemon() -> None:
+    """Manage the background daemon that keeps caches warm."""
+
+
+@daemon.command()
+@socket_option
+@click.option(
+    "--idle-timeout",
+    type=float,
+    default=900.0,
+    show_default=True,
+    help="Seconds without a request before the daemon exits.",
+)
+@click.option("-v", "--verbose", is_flag=True, help="Log every request.")
+def start(socket_path: Optional[Path], idle_timeout: float, verbose: bool) -> None:
+    """Run the daemon in the foreground."""
+
+    import asyncio
+    import logging
+
+    from severn.daemon.server import Daemon
+
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    try:
+        asyncio.run(Daemon(socket_path, idle_timeout=idle_timeout).serve())
+    except (PermissionError, RuntimeError) as exc:
+        raise click.ClickException(str(exc)) from None
+    except KeyboardInterrupt:
+        pass
+
+
+@daemon.command()
+@socket_option
+def stop(socket_path: Optional[Path]) -> None:
+    """Stop a running daemon."""
+
+    from severn.daemon import DaemonClient
+
+    try:
+        with DaemonClient(socket_path, spawn=False) as client:
+            client.shutdown()
+    except PermissionError as exc:
+        raise click.ClickException(str(exc)) from None
+    except OSError:
+        click.echo("The daemon is not running")
+        return
+
+    click.echo("The daemon has been stopped")
+
+
+@daemon.command()
+@socket_option
+@click.pass_context
+def status(ctx: click.Context, socket_path: Optional[Path]) -> None:
+    """Show whether the daemon is running."""
+
+    from severn.daemon import DaemonClient
+
+    try:
+        with DaemonClient(socket_path, spawn=False) as client:
+            info = client.ping()
+    except PermissionError as exc:
+        raise click.ClickException(str(exc)) from None
+    except OSError:
+        click.echo("The daemon is not running")
+        ctx.exit(1)
+
+    click.echo(
+        f"The daemon is running (pid {info['pid']}, up {info['uptime']:.0f}s, "
+        f"{info['requests']:,} requests served, {info['files']:,} files cached)"
+    )
+
+
+def main() -> None:
+    cli(prog_name="severn")
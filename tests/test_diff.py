@@ -0,0 +1,191 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+from click.testing import CliRunner
+
+from severn.api.constraint import Constraint
+from severn.api.dependency import Dependency
+from severn.api.diff import (
+    ADDED,
+    CHANGED,
+    DOWNGRADE,
+    INSTALL,
+    LOOSENED,
+    REINSTALL,
+    REMOVE,
+    REMOVED,
+    TIGHTENED,
+    UNCHANGED,
+    UPGRADE,
+    Operation,
+    diff_requirements,
+    plan,
+)
+from severn.api.lock import LOCK_VERSION
+from severn.ux import cli
+
+
+def _dependency(name: str, *constraints: str) -> Dependency:
+    return Dependency(name, [Constraint.from_string(c) for c in constraints])
+
+
+def _kind(before: List[str], after: List[str]) -> str:
+    (change,) = diff_requirements(
+        [_dependency("click", *before)], [_dependency("click", *after)]
+    )
+    return change.kind
+
+
+@pytest.mark.parametrize(
+    ("before", "after", "kind"),
+    [
+        ([">=8"], [">=8"], UNCHANGED),
+        (["~=1.4.2"], [">=1.4.2", "<1.5"], UNCHANGED),
+        (["==1.4.*"], [">=1.4", "<1.5"], UNCHANGED),
+        (["~=2.2"], [">=2.2", "<3"], UNCHANGED),
+        # Exclusions outside the bounds don't count.
+        ([">=8"], [">=8", "!=7.0"], UNCHANGED),
+        ([">=8"], [">=8.1"], TIGHTENED),
+        ([">=8"], [">8"], TIGHTENED),
+        ([], ["<9"], TIGHTENED),
+        (["~=1.4.2"], [">=1.4.2", "<1.4.5"], TIGHTENED),
+        ([">=8", "!=8.1.0"], [">=8"], LOOSENED),
+        (["==8.1.3"], [">=8"], LOOSENED),
+        (["<1.5"], ["~=1.4"], CHANGED),
+        ([">=8"], ["<8"], CHANGED),
+        # Pre, post, dev and epoch all place versions.
+        ([">=1.0"], [">=1.0a1"], LOOSENED),
+        ([">=1.0.post1"], [">=1.0.post2"], TIGHTENED),
+        ([">=1.0.dev1"], [">=1.0"], TIGHTENED),
+        ([">=1.0"], [">=1!0.1"], TIGHTENED),
+    ],
+)
+def test_diff_kinds(before: List[str], after: List[str], kind: str) -> None:
+    assert _kind(before, after) == kind
+
+
+def test_diff_requirements() -> None:
+    before = [
+        _dependency("Click", ">=8"),
+        _dependency("attrs"),
+        _dependency("click", "<9"),
+    ]
+    after = [_dependency("aiohttp"), _dependency("click", ">=8", "<9")]
+
+    changes = diff_requirements(before, after)
+    assert [(c.name, c.kind) for c in changes] == [
+        ("aiohttp", ADDED),
+        ("attrs", REMOVED),
+        ("click", UNCHANGED),
+    ]
+    assert changes[0].before is None and changes[0].after is after[0]
+    assert changes[1].before is before[1] and changes[1].after is None
+
+
+def test_plan() -> None:
+    target = {"Click": "8.1.3", "attrs": "23.1.0", "aiohttp": "3.8.4", "six": "1.16"}
+    installed = {
+        "click": "7.1.2",
+        "attrs": "23.1.0",
+        "aiohttp": "3.9.0",
+        "six": "1.16.0",
+        "colorama": "0.4.6",
+        "pip": "23.1",
+        "Zope.Interface": "6.0",
+    }
+
+    assert plan(target, installed, keep=["zope-interface"]) == [
+        Operation(REMOVE, "colorama", current="0.4.6"),
+        Operation(DOWNGRADE, "aiohttp", current="3.9.0", target="3.8.4"),
+        Operation(UPGRADE, "click", current="7.1.2", target="8.1.3"),
+    ]
+
+
+def test_plan_keeps_extraneous() -> None:
+    operations = plan(
+        {"click": "8.1.3"}, {"colorama": "0.4.6"}, remove_extraneous=False
+    )
+    assert operations == [Operation(INSTALL, "click", target="8.1.3")]
+
+
+def test_plan_non_pep440_versions() -> None:
+    operations = plan(
+        {"legacy": "2013b", "other": "1.0"}, {"legacy": "2012c", "other": "1.0"}
+    )
+    assert operations == [
+        Operation(REINSTALL, "legacy", current="2012c", target="2013b")
+    ]
+
+
+def _distribution(site: Path, name: str, version: str, *requires: str) -> None:
+    dist_info = site / f"{name}-{version}.dist-info"
+    dist_info.mkdir()
+    headers = [f"Name: {name}", f"Version: {version}"]
+    headers.extend(f"Requires-Dist: {r}" for r in requires)
+    (dist_info / "METADATA").write_text("\n".join(headers) + "\n\nREADME\n")
+
+
+def test_plan_command_keeps_requirements(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("SEVERN_CACHE_DIR", str(tmp_path / "cache"))
+    version = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+    site = tmp_path / "venv" / "lib" / version / "site-packages"
+    site.mkdir(parents=True)
+    _distribution(site, "aiohttp", "3.8.4", "yarl>=1.0", "pytest; extra == 'test'")
+    _distribution(site, "yarl", "1.9.2", "idna>=2.0")
+    _distribution(site, "idna", "3.4")
+    _distribution(site, "pytest", "7.3.1")
+    _distribution(site, "colorama", "0.4.6")
+
+    lock = tmp_path / "severn.lock"
+    lock.write_text(
+        json.dumps(
+            {
+                "version": LOCK_VERSION,
+                "packages": [{"name": "aiohttp", "version": "3.8.4"}],
+            }
+        )
+    )
+
+    result = CliRunner().invoke(
+        cli, ["plan", str(lock), "--venv", str(tmp_path / "venv")]
+    )
+    assert result.exit_code == 0, result.output
+    # aiohttp's own requirements stay, but not ones behind extras.
+    assert result.output.splitlines() == [
+        "remove colorama==0.4.6",
+        "remove pytest==7.3.1",
+        "2 operations needed",
+    ]
@@ -0,0 +1,279 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from severn.api.dependency import Dependency
+from severn.api.download import Downloader
+from severn.api.store import ContentStore
+
+CONTENT = bytes(range(256)) * 4096
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+ETAG = '"v1"'
+
+
+class Artifacts:
+    # What the stand-in index serves, and what it was asked for.
+    def __init__(self) -> None:
+        self.content = CONTENT
+        self.etag = ETAG
+        self.honour_if_range = True
+        self.requests: List[Dict[str, Optional[str]]] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(
+            {
+                "range": request.headers.get("Range"),
+                "if_range": request.headers.get("If-Range"),
+            }
+        )
+        headers = {"ETag": self.etag}
+        await asyncio.sleep(0.01)
+
+        if not (requested := request.headers.get("Range")):
+            return web.Response(body=self.content, headers=headers)
+
+        if self.honour_if_range and request.headers.get("If-Range") != self.etag:
+            return web.Response(body=self.content, headers=headers)
+
+        start = int(requested.removeprefix("bytes=").rstrip("-"))
+        size = len(self.content)
+        if start >= size:
+            headers["Content-Range"] = f"bytes */{size}"
+            return web.Response(status=416, headers=headers)
+
+        headers["Content-Range"] = f"bytes {start}-{size - 1}/{size}"
+        return web.Response(status=206, body=self.content[start:], headers=headers)
+
+
+@pytest.fixture()
+def artifacts() -> Artifacts:
+    return Artifacts()
+
+
+@pytest_asyncio.fixture()
+async def server(artifacts: Artifacts) -> AsyncIterator[TestServer]:
+    app = web.Application()
+    app.router.add_get("/files/demo-1.0-py3-none-any.whl", artifacts.handle)
+
+    async with TestServer(app) as server:
+        yield server
+
+
+@pytest.fixture()
+def store(tmp_path: Path) -> ContentStore:
+    return ContentStore(tmp_path)
+
+
+def _url(server: TestServer) -> str:
+    return str(server.make_url("/files/demo-1.0-py3-none-any.whl"))
+
+
+def _partial(store: ContentStore, url: str, data: bytes, validator: str) -> None:
+    partial = store.partial_path(url)
+    partial.write_bytes(data)
+    partial.with_suffix(".json").write_text(json.dumps({"validator": validator}))
+
+
+@pytest.mark.asyncio()
+async def test_download(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+
+    async with Downloader(store) as downloader:
+        artifact = await downloader.fetch(url)
+
+    assert artifact.filename == "demo-1.0-py3-none-any.whl"
+    assert artifact.sha256 == DIGEST
+    assert artifact.path == store.path_for(DIGEST)
+    assert artifact.path.read_bytes() == CONTENT
+    assert store.lookup_url(url) == DIGEST
+    assert not store.partial_path(url).exists()
+
+
+@pytest.mark.asyncio()
+async def test_resumes_partial_download(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+    _partial(store, url, CONTENT[:1000], ETAG)
+
+    async with Downloader(store) as downloader:
+        artifact = await downloader.fetch(url)
+
+    assert artifact.sha256 == DIGEST
+    assert artifacts.requests == [{"range": "bytes=1000-", "if_range": ETAG}]
+
+
+@pytest.mark.asyncio()
+async def test_restarts_when_file_changed(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+    _partial(store, url, b"x" * 1000, '"v0"')
+
+    async with Downloader(store) as downloader:
+        artifact = await downloader.fetch(url)
+
+    # An index honouring If-Range sends the whole (new) file straight away.
+    assert artifact.sha256 == DIGEST
+    assert len(artifacts.requests) == 1
+
+
+@pytest.mark.asyncio()
+async def test_restarts_when_if_range_ignored(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+    artifacts.honour_if_range = False
+    _partial(store, url, b"x" * 1000, '"v0"')
+
+    async with Downloader(store) as downloader:
+        artifact = await downloader.fetch(url)
+
+    # The 206 came with the wrong validator, so it was thrown away.
+    assert artifact.sha256 == DIGEST
+    assert [r["range"] for r in artifacts.requests] == ["bytes=1000-", None]
+
+
+@pytest.mark.asyncio()
+async def test_restarts_on_416(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+    _partial(store, url, CONTENT + b"extra", ETAG)
+
+    async with Downloader(store) as downloader:
+        artifact = await downloader.fetch(url)
+
+    assert artifact.sha256 == DIGEST
+    assert [r["range"] for r in artifacts.requests] == [
+        f"bytes={len(CONTENT) + 5}-",
+        None,
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_hash_mismatch(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+
+    async with Downloader(store) as downloader:
+        with pytest.raises(ValueError, match="hash mismatch"):
+            await downloader.fetch(url, sha256="0" * 64)
+
+    assert not store.contains(DIGEST)
+    assert store.lookup_url(url) is None
+    assert not store.partial_path(url).exists()
+
+
+@pytest.mark.asyncio()
+async def test_fragment_hash_is_checked(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+
+    async with Downloader(store) as downloader:
+        artifact = await downloader.fetch(f"{url}#sha256={DIGEST.upper()}")
+        with pytest.raises(ValueError, match="hash mismatch"):
+            await downloader.fetch(f"{url}#sha256={'0' * 64}")
+
+    assert artifact.url == url
+
+
+@pytest.mark.asyncio()
+async def test_deduplicates_downloads(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+
+    async with Downloader(store) as downloader:
+        first = await asyncio.gather(*(downloader.fetch(url) for _ in range(4)))
+
+    async with Downloader(store) as downloader:
+        again = await downloader.fetch(url)
+        pinned = await downloader.fetch(url, sha256=DIGEST)
+
+    assert {a.path for a in (*first, again, pinned)} == {store.path_for(DIGEST)}
+    assert len(artifacts.requests) == 1
+
+
+@pytest.mark.asyncio()
+async def test_waits_for_other_process(
+    server: TestServer, artifacts: Artifacts, store: ContentStore, tmp_path: Path
+) -> None:
+    url = _url(server)
+    lock = store.lock_partial(url)
+    assert lock is not None
+    assert store.lock_partial(url) is None
+
+    async def other_process() -> None:
+        # Finishes the download and lets go, like a concurrent run would.
+        await asyncio.sleep(0.2)
+        download = tmp_path / "download"
+        download.write_bytes(CONTENT)
+        store.add(download, DIGEST)
+        store.remember(url, DIGEST)
+        os.close(lock)
+
+    async with Downloader(store) as downloader:
+        artifact, _ = await asyncio.gather(downloader.fetch(url), other_process())
+
+    assert artifact.sha256 == DIGEST
+    assert artifacts.requests == []
+
+
+@pytest.mark.asyncio()
+async def test_dependency_hashes_are_checked(
+    server: TestServer, artifacts: Artifacts, store: ContentStore
+) -> None:
+    url = _url(server)
+    wrong = Dependency("demo", location=url, hashes=[f"sha256:{'0' * 64}"])
+    either = Dependency("demo", location=url, hashes=[f"sha256:{'1' * 64}"])
+
+    async with Downloader(store) as downloader:
+        with pytest.raises(ValueError, match="hash mismatch"):
+            await downloader.fetch_dependencies([wrong])
+
+        either.hashes.append(f"sha256:{DIGEST}")
+        fetched = await downloader.fetch_dependencies([either])
+
+    assert fetched["demo"].sha256 == DIGEST
+    assert not store.contains("0" * 64)
@@ -0,0 +1,174 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from severn.api import environment
+from severn.api.environment import (
+    Distribution,
+    installed_versions,
+    requirement_closure,
+    scan,
+    snapshot,
+)
+
+
+@pytest.fixture(autouse=True)
+def caches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEVERN_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(environment, "_scans", {})
+
+
+def _distribution(entry: Path, name: str, version: str, *headers: str) -> Path:
+    dist_info = entry / f"{name}-{version}.dist-info"
+    dist_info.mkdir(parents=True)
+    lines = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+    (dist_info / "METADATA").write_text("\n".join((*lines, *headers)) + "\n")
+    return dist_info
+
+
+def _touch(path: Path, ns: int) -> None:
+    # Filesystem timestamps can be too coarse to tell two quick changes apart.
+    os.utime(path, ns=(ns, ns))
+
+
+def test_reads_headers_only(tmp_path: Path) -> None:
+    _distribution(
+        tmp_path,
+        "click",
+        "8.1.3",
+        "Requires-Dist: colorama; platform_system == 'Windows'",
+        "requires-dist: importlib-metadata",
+        " Requires-Dist: indented continuation, not a header",
+        "",
+        "Requires-Dist: in the README, not a header",
+        "\xff" * 10_000,
+    )
+    egg_info = tmp_path / "legacy-1.0.egg-info"
+    egg_info.mkdir()
+    (egg_info / "PKG-INFO").write_text("Name: legacy\nVersion: 1.0\n")
+    (tmp_path / "broken-1.0.dist-info").mkdir()
+    (tmp_path / "click").mkdir()
+
+    assert sorted(scan(str(tmp_path)), key=lambda d: d.name) == [
+        Distribution(
+            "click",
+            "8.1.3",
+            ["colorama; platform_system == 'Windows'", "importlib-metadata"],
+            str(tmp_path / "click-8.1.3.dist-info"),
+        ),
+        Distribution("legacy", "1.0", [], str(egg_info)),
+    ]
+
+
+def test_missing_entry(tmp_path: Path) -> None:
+    assert scan(str(tmp_path / "nope")) == []
+    (tmp_path / "archive.zip").write_bytes(b"")
+    assert scan(str(tmp_path / "archive.zip")) == []
+
+
+def test_snapshot_shadowing(tmp_path: Path) -> None:
+    first, second = tmp_path / "first", tmp_path / "second"
+    _distribution(first, "Zope.Interface", "6.0")
+    _distribution(second, "zope-interface", "5.5")
+    _distribution(second, "click", "8.1.3")
+
+    installed = snapshot([str(first), str(second)])
+    assert {k: d.version for k, d in installed.items()} == {
+        "zope-interface": "6.0",
+        "click": "8.1.3",
+    }
+    assert installed_versions([str(second), str(first)]) == {
+        "zope-interface": "5.5",
+        "click": "8.1.3",
+    }
+
+
+def test_memory_cache(tmp_path: Path) -> None:
+    entry = tmp_path / "site-packages"
+    _distribution(entry, "click", "8.1.3")
+    _touch(entry, 1_000_000_000)
+
+    first = scan(str(entry), persist=False)
+    assert scan(str(entry), persist=False) is first
+
+    _distribution(entry, "attrs", "23.1.0")
+    _touch(entry, 2_000_000_000)
+    assert sorted(d.name for d in scan(str(entry), persist=False)) == [
+        "attrs",
+        "click",
+    ]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_disk_cache(tmp_path: Path) -> None:
+    entry = tmp_path / "site-packages"
+    dist_info = _distribution(entry, "click", "8.1.3")
+    _touch(entry, 1_000_000_000)
+    assert [d.version for d in scan(str(entry))] == ["8.1.3"]
+
+    # Rewriting a file in place doesn't touch the entry's mtime, so a fresh
+    # process trusts what's on disk...
+    (dist_info / "METADATA").write_text("Name: click\nVersion: 9.0\n")
+    environment._scans.clear()
+    assert [d.version for d in scan(str(entry))] == ["8.1.3"]
+
+    # ...until the entry changes.
+    _touch(entry, 2_000_000_000)
+    environment._scans.clear()
+    assert [d.version for d in scan(str(entry))] == ["9.0"]
+
+
+def _installed(requires: Dict[str, List[str]]) -> Dict[str, Distribution]:
+    # Keyed by normalized name, as snapshot() returns them.
+    return {name: Distribution(name, "1.0", r) for name, r in requires.items()}
+
+
+def test_requirement_closure() -> None:
+    installed = _installed(
+        {
+            "app": ["Web_Framework>=2", "pytest; extra == 'test'"],
+            "web-framework": ["templates (>=1.0)", "missing"],
+            "templates": ["app"],
+            "pytest": [],
+            "other": [],
+        }
+    )
+
+    assert requirement_closure(["App"], installed) == {
+        "app",
+        "web-framework",
+        "templates",
+        "missing",
+    }
+    assert requirement_closure([], installed) == set()
+    assert requirement_closure(["unknown"], installed) == {"unknown"}
@@ -0,0 +1,113 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from severn.api.dependency import Dependency
+from severn.api.hashing import HashVerifier
+
+CONTENT = b"not really a wheel"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture()
+def verifier(tmp_path: Path) -> HashVerifier:
+    return HashVerifier(cache_path=tmp_path / "digests")
+
+
+@pytest.fixture()
+def wheelhouse(tmp_path: Path) -> Path:
+    directory = tmp_path / "wheelhouse"
+    directory.mkdir()
+    (directory / "click-8.1.3-py3-none-any.whl").write_bytes(CONTENT)
+    (directory / "attrs-23.1.0-py3-none-any.whl").write_bytes(CONTENT)
+    (directory / "notes.txt").write_bytes(b"")
+    return directory
+
+
+def test_verify(tmp_path: Path, verifier: HashVerifier) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(CONTENT)
+
+    assert verifier.verify(path, [f"sha256:{DIGEST.upper()}"])
+    assert verifier.verify(path, [f"sha256:{'0' * 64}", f"sha256:{DIGEST}"])
+    assert not verifier.verify(path, [f"sha256:{'0' * 64}"])
+    assert not verifier.verify(path, [])
+
+
+def test_rejected_algorithm(tmp_path: Path, verifier: HashVerifier) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(CONTENT)
+    md5 = hashlib.md5(CONTENT).hexdigest()
+
+    with pytest.raises(ValueError, match="unsupported hash algorithm 'md5'"):
+        verifier.verify(path, [f"md5:{md5}"])
+
+
+def test_verify_wheelhouse(wheelhouse: Path, verifier: HashVerifier) -> None:
+    dependencies = [
+        Dependency("Click", hashes=[f"sha256:{'0' * 64}"]),
+        Dependency("typing_extensions", hashes=[f"sha256:{DIGEST}"]),
+    ]
+
+    # attrs has nothing to check against, which isn't the same as failing.
+    assert verifier.verify_wheelhouse(wheelhouse, dependencies) == {
+        wheelhouse / "attrs-23.1.0-py3-none-any.whl": None,
+        wheelhouse / "click-8.1.3-py3-none-any.whl": False,
+    }
+
+
+def test_verify_wheelhouse_checks_algorithms_first(
+    wheelhouse: Path, verifier: HashVerifier
+) -> None:
+    dependencies = [Dependency("click", hashes=["sha1:abc"])]
+
+    with pytest.raises(ValueError, match="unsupported hash algorithm 'sha1'"):
+        verifier.verify_wheelhouse(wheelhouse, dependencies)
+
+    assert not verifier.cache_path.exists()
+
+
+def test_digest_cache(tmp_path: Path, verifier: HashVerifier) -> None:
+    path = tmp_path / "file"
+    path.write_bytes(CONTENT)
+    assert verifier.digests([path]) == {path: DIGEST}
+
+    # Same size and mtime, different contents: only ctime gives it away.
+    st = path.stat()
+    time.sleep(0.05)  # Past the filesystem's timestamp granularity.
+    path.write_bytes(CONTENT.upper())
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    reloaded = HashVerifier(cache_path=verifier.cache_path)
+    assert reloaded.digest(path) == hashlib.sha256(CONTENT.upper()).hexdigest()
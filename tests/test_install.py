@@ -0,0 +1,94 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import csv
+import sys
+import zipfile
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from severn.api.install import Installer, WheelCache
+
+
+def _wheel(path: Path, files: Dict[str, str]) -> Path:
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return path
+
+
+def _good(tmp_path: Path, name: str) -> Path:
+    dist_info = f"{name}-1.0.dist-info"
+    return _wheel(
+        tmp_path / f"{name}-1.0-py3-none-any.whl",
+        {
+            f"{name}.py": "VALUE = 1\n",
+            f"{dist_info}/METADATA": f"Name: {name}\nVersion: 1.0\n",
+            f"{dist_info}/RECORD": f"{name}.py,,\n{dist_info}/METADATA,,\n",
+        },
+    )
+
+
+@pytest.fixture()
+def installer(tmp_path: Path) -> Installer:
+    version = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+    (tmp_path / "venv" / "lib" / version / "site-packages").mkdir(parents=True)
+    return Installer(tmp_path / "venv", cache=WheelCache(tmp_path / "cache"))
+
+
+def test_install(tmp_path: Path, installer: Installer) -> None:
+    installed = installer.install([_good(tmp_path, "alpha"), _good(tmp_path, "beta")])
+    assert installed == ["alpha-1.0", "beta-1.0"]
+
+    dist_info = installer.site_packages / "alpha-1.0.dist-info"
+    assert (dist_info / "INSTALLER").read_text() == "severn\n"
+    with (dist_info / "RECORD").open(newline="") as f:
+        recorded = [row[0] for row in csv.reader(f)]
+
+    assert recorded == [
+        "alpha.py",
+        "alpha-1.0.dist-info/METADATA",
+        "alpha-1.0.dist-info/INSTALLER",
+        "alpha-1.0.dist-info/RECORD",
+    ]
+
+
+def test_bad_wheel_in_batch(tmp_path: Path, installer: Installer) -> None:
+    bad = _wheel(tmp_path / "bad-1.0-py3-none-any.whl", {"bad.py": ""})
+
+    with pytest.raises(ValueError, match="no .dist-info directory"):
+        installer.install([_good(tmp_path, "alpha"), bad, _good(tmp_path, "beta")])
+
+    # The wheels that did install are recorded, so they can still be removed.
+    for name in ("alpha", "beta"):
+        dist_info = installer.site_packages / f"{name}-1.0.dist-info"
+        assert (installer.site_packages / f"{name}.py").is_file()
+        assert (dist_info / "INSTALLER").is_file()
+        assert (dist_info / "RECORD").is_file()
@@ -0,0 +1,64 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+from pathlib import Path
+
+import pytest
+
+from severn.api.lock import LOCK_VERSION, Lockfile
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    environments = {
+        "linux": {"sys_platform": "linux", "python_version": "3.11"},
+        "windows": {"sys_platform": "win32", "python_version": "3.11"},
+    }
+    lock = Lockfile(
+        {"click": "8.1.3"},
+        environments=environments,
+        scoped={"linux": {"uvloop": "0.17.0"}, "windows": {"colorama": "0.4.6"}},
+    )
+    lock.dump(tmp_path / "severn.lock")
+
+    loaded = Lockfile.load(tmp_path / "severn.lock")
+    assert loaded.environments == environments
+    assert loaded.pins_for("linux") == {"click": "8.1.3", "uvloop": "0.17.0"}
+    assert loaded.pins_for("windows") == {"click": "8.1.3", "colorama": "0.4.6"}
+
+    with pytest.raises(LookupError, match="no environment named 'macos'"):
+        loaded.pins_for("macos")
+
+
+@pytest.mark.parametrize("version", [1, LOCK_VERSION + 1, None])
+def test_unsupported_version(tmp_path: Path, version: object) -> None:
+    path = tmp_path / "severn.lock"
+    path.write_text(json.dumps({"version": version, "packages": []}))
+
+    with pytest.raises(ValueError, match="unsupported lock file version"):
+        Lockfile.load(path)
@@ -0,0 +1,74 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+
+from severn.api.markers import default_environment, evaluate, parse_target
+
+LINUX = {**default_environment(), "sys_platform": "linux", "python_version": "3.11"}
+
+
+def test_parse_target() -> None:
+    assert parse_target(" sys_platform = win32 ,python_version=3.9") == {
+        "sys_platform": "win32",
+        "python_version": "3.9",
+    }
+
+
+@pytest.mark.parametrize("raw", ["", "linux", "=linux", "sys_platform=linux,"])
+def test_invalid_target(raw: str) -> None:
+    with pytest.raises(ValueError, match="invalid target"):
+        parse_target(raw)
+
+
+@pytest.mark.parametrize(
+    ("markers", "expected"),
+    [
+        ({}, True),
+        ({"sys_platform": "==linux"}, True),
+        ({"sys_platform": "!=linux"}, False),
+        ({"python_version": ">=3.8,<4"}, True),
+        ({"python_version": ">=3.8,<3.11"}, False),
+        # Versions compare as versions, not strings.
+        ({"python_version": ">3.9"}, True),
+        ({"python_version": "~=3.10"}, True),
+        ({"python_version": ">=3.8", "sys_platform": "==win32"}, False),
+        # Nothing asked for extras.
+        ({"extra": "==test"}, False),
+    ],
+)
+def test_evaluate(markers: dict, expected: bool) -> None:
+    assert evaluate(markers, LINUX) is expected
+
+
+@pytest.mark.parametrize(
+    "markers", [{"sys_platform": "~=linux"}, {"sys_platform": "linux"}]
+)
+def test_evaluate_invalid(markers: dict) -> None:
+    with pytest.raises(ValueError):
+        evaluate(markers, LINUX)
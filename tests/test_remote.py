@@ -0,0 +1,109 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, List
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from severn.api.remote import RemoteFiles
+
+CONTENT = b"click>=8\n" * 10_000
+ETAG = '"v1"'
+
+
+@pytest.fixture()
+def statuses() -> List[int]:
+    return []
+
+
+@pytest_asyncio.fixture()
+async def server(statuses: List[int]) -> AsyncIterator[TestServer]:
+    async def handler(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == ETAG:
+            statuses.append(304)
+            return web.Response(status=304, headers={"ETag": ETAG})
+
+        statuses.append(200)
+        # Slow enough that concurrent requests for it overlap.
+        await asyncio.sleep(0.05)
+        return web.Response(body=CONTENT, headers={"ETag": ETAG})
+
+    app = web.Application()
+    app.router.add_get("/requirements.txt", handler)
+
+    async with TestServer(app) as server:
+        yield server
+
+
+async def _read(remote: RemoteFiles, url: str) -> bytes:
+    return b"".join([chunk async for chunk in remote.stream(url)])
+
+
+@pytest.mark.asyncio()
+async def test_revalidates_cached_copy(
+    server: TestServer, statuses: List[int], tmp_path: Path
+) -> None:
+    url = str(server.make_url("/requirements.txt"))
+
+    async with RemoteFiles(root=tmp_path) as remote:
+        assert await _read(remote, url) == CONTENT
+
+    async with RemoteFiles(root=tmp_path) as remote:
+        assert await _read(remote, url) == CONTENT
+
+    assert statuses == [200, 304]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio()
+async def test_duplicate_urls_fetched_once(
+    server: TestServer, statuses: List[int], tmp_path: Path
+) -> None:
+    url = str(server.make_url("/requirements.txt"))
+
+    async with RemoteFiles(root=tmp_path) as remote:
+        bodies: List[bytes] = await asyncio.gather(
+            *(_read(remote, url) for _ in range(4))
+        )
+
+    assert bodies == [CONTENT] * 4
+    assert statuses == [200]
+
+
+@pytest.mark.asyncio()
+async def test_missing_file(server: TestServer, tmp_path: Path) -> None:
+    url = str(server.make_url("/nope.txt"))
+
+    async with RemoteFiles(root=tmp_path) as remote:
+        with pytest.raises(FileNotFoundError):
+            await _read(remote, url)
@@ -0,0 +1,180 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, List
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from severn.api.parsers import RequirementsFile
+from severn.api.remote import RemoteFiles
+
+
+@pytest.mark.asyncio()
+async def test_include_cycle(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("-r b.txt\nclick\n")
+    (tmp_path / "b.txt").write_text("-r a.txt\nattrs\n")
+
+    with pytest.raises(ValueError, match="circular include"):
+        await RequirementsFile(tmp_path / "a.txt").parse()
+
+
+@pytest.mark.asyncio()
+async def test_self_include(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("-r a.txt\n")
+
+    with pytest.raises(ValueError, match="circular include"):
+        await RequirementsFile(tmp_path / "a.txt").parse()
+
+
+@pytest.mark.asyncio()
+async def test_shared_include_is_not_a_cycle(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("-r b.txt\n-r c.txt\n")
+    (tmp_path / "b.txt").write_text("-r d.txt\n")
+    (tmp_path / "c.txt").write_text("-r d.txt\n")
+    (tmp_path / "d.txt").write_text("click\n")
+
+    dependencies = await RequirementsFile(tmp_path / "a.txt").parse()
+    assert [d.name for d in dependencies] == ["click", "click"]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    "markers",
+    [
+        'python_version in "3.8 3.9"',
+        'python_version not in "3.8"',
+        'python_version < "3.9" or os_name == "nt"',
+        '(os_name == "nt")',
+        '"linux" == sys_platform',
+    ],
+)
+async def test_unsupported_markers(tmp_path: Path, markers: str) -> None:
+    (tmp_path / "a.txt").write_text(f"click; {markers}\n")
+
+    with pytest.raises(ValueError, match="unsupported marker expression"):
+        await RequirementsFile(tmp_path / "a.txt").parse()
+
+
+@pytest.mark.asyncio()
+async def test_hashes_across_continuations(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text(
+        "click==8.1.3 \\\n"
+        f"    --hash=sha256:{'A' * 64} \\\n"
+        f"    --hash sha256:{'b' * 64}\n"
+        "attrs==23.1.0\n"
+    )
+
+    click, attrs = await RequirementsFile(tmp_path / "a.txt").parse()
+    assert click.name == "click"
+    assert [str(c) for c in click.constraints] == ["==8.1.3"]
+    assert click.hashes == [f"sha256:{'a' * 64}", f"sha256:{'b' * 64}"]
+    assert attrs.hashes == []
+
+
+@pytest.mark.asyncio()
+async def test_markers_joined_by_and(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text(
+        'click; python_version >= "3.8" and python_version < "4"'
+        ' and sys_platform == "linux"\n'
+        "attrs ; os_name=='nt'\n"
+        'android-tools; platform_system == "Android"\n'
+    )
+
+    click, attrs, tools = await RequirementsFile(tmp_path / "a.txt").parse()
+    assert click.env_markers == {
+        "python_version": ">=3.8,<4",
+        "sys_platform": "==linux",
+    }
+    assert attrs.env_markers == {"os_name": "==nt"}
+    # "and" inside a value isn't a separator.
+    assert tools.env_markers == {"platform_system": "==Android"}
+
+
+@pytest.fixture()
+def events() -> List[str]:
+    return []
+
+
+@pytest_asyncio.fixture()
+async def index(events: List[str]) -> AsyncIterator[TestServer]:
+    files = {
+        "/reqs/main.txt": "-r base.txt\nclick\n-r extra/dev.txt\nattrs\n",
+        "/reqs/base.txt": "aiohttp\n",
+        "/reqs/extra/dev.txt": "-r ../lint.txt\npytest\n",
+        "/reqs/lint.txt": "ruff\n",
+    }
+
+    async def handler(request: web.Request) -> web.Response:
+        events.append(f"start {request.path}")
+        # Slow enough that sibling includes overlap, with the first one
+        # finishing last.
+        await asyncio.sleep(0.2 if request.path == "/reqs/base.txt" else 0.01)
+        events.append(f"end {request.path}")
+        return web.Response(text=files[request.path])
+
+    app = web.Application()
+    for path in files:
+        app.router.add_get(path, handler)
+
+    async with TestServer(app) as server:
+        yield server
+
+
+@pytest.mark.asyncio()
+async def test_remote_includes(
+    index: TestServer, events: List[str], tmp_path: Path
+) -> None:
+    url = str(index.make_url("/reqs/main.txt"))
+
+    async with RemoteFiles(root=tmp_path) as remote:
+        reqfile = RequirementsFile(url, remote=remote)
+        dependencies = await reqfile.parse()
+
+    # In the order of the lines that brought them in, however long each
+    # include took.
+    assert [d.name for d in dependencies] == [
+        "aiohttp",
+        "click",
+        "ruff",
+        "pytest",
+        "attrs",
+    ]
+    # Relative includes are relative to the URL of the file naming them.
+    assert reqfile.includes == [
+        str(index.make_url("/reqs/base.txt")),
+        str(index.make_url("/reqs/extra/dev.txt")),
+        str(index.make_url("/reqs/lint.txt")),
+    ]
+    # dev.txt, and the file it includes, were fetched while base.txt was
+    # still on its way.
+    assert events.index("end /reqs/lint.txt") < events.index("end /reqs/base.txt")
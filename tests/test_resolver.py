@@ -0,0 +1,113 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from typing import Dict, List
+
+import pytest
+
+from severn.api.constraint import Constraint
+from severn.api.dependency import Dependency
+from severn.api.resolver import Resolver
+
+
+class Index:
+    # Stands in for PackageIndex, which the resolver only asks for versions.
+    def __init__(self, versions: Dict[str, List[str]]) -> None:
+        self._versions = versions
+        self.requested: List[str] = []
+
+    async def versions(self, name: str) -> List[str]:
+        self.requested.append(name)
+        return self._versions[name]
+
+
+INDEX = {
+    "click": ["7.1.2", "8.1.3", "9.0.0a1"],
+    "colorama": ["0.4.5", "0.4.6"],
+    "importlib-metadata": ["4.13.0", "6.0.0"],
+    "uvloop": ["0.17.0"],
+}
+
+
+def _dependency(name: str, **markers: str) -> Dependency:
+    return Dependency(name, env_markers=markers)
+
+
+@pytest.mark.asyncio()
+async def test_resolve() -> None:
+    resolver = Resolver(Index(INDEX))
+    dependencies = [_dependency("click"), _dependency("colorama", os_name="==nt")]
+
+    assert await resolver.resolve(dependencies, {"os_name": "posix"}) == {
+        "click": "8.1.3"
+    }
+
+
+@pytest.mark.asyncio()
+async def test_resolve_universal() -> None:
+    resolver = Resolver(Index(INDEX))
+    environments = {
+        "linux-38": {"sys_platform": "linux", "python_version": "3.8"},
+        "linux-311": {"sys_platform": "linux", "python_version": "3.11"},
+        "windows-311": {"sys_platform": "win32", "python_version": "3.11"},
+    }
+    dependencies = [
+        _dependency("click"),
+        _dependency("colorama", sys_platform="==win32"),
+        _dependency("uvloop", sys_platform="!=win32"),
+        _dependency("importlib-metadata", python_version="<3.10"),
+        # Split by its markers, but resolves the same everywhere it applies.
+        Dependency("click", env_markers={"python_version": ">=3.8"}),
+    ]
+
+    pins, scoped = await resolver.resolve_universal(dependencies, environments)
+
+    assert pins == {"click": "8.1.3"}
+    assert scoped == {
+        "linux-38": {"uvloop": "0.17.0", "importlib-metadata": "6.0.0"},
+        "linux-311": {"uvloop": "0.17.0"},
+        "windows-311": {"colorama": "0.4.6"},
+    }
+
+
+@pytest.mark.asyncio()
+async def test_resolve_universal_diverging_versions() -> None:
+    resolver = Resolver(Index(INDEX))
+    environments = {"old": {"python_version": "3.7"}, "new": {"python_version": "3.11"}}
+    dependencies = [
+        Dependency(
+            "click",
+            constraints=[Constraint.from_string("<8")],
+            env_markers={"python_version": "<3.8"},
+        ),
+        Dependency("click", env_markers={"python_version": ">=3.8"}),
+    ]
+
+    pins, scoped = await resolver.resolve_universal(dependencies, environments)
+    assert pins == {}
+    assert scoped == {"old": {"click": "7.1.2"}, "new": {"click": "8.1.3"}}
@@ -0,0 +1,143 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from severn.api.constraint import MAX_VERSION, Constraint
+from severn.api.dependency import Dependency
+from severn.api.parsers import RequirementsFile
+from severn.api.serial import (
+    aiter_ndjson,
+    dump_json,
+    dump_ndjson,
+    encode_dependency,
+    iter_ndjson,
+    load_json,
+    load_ndjson,
+)
+
+CONSTRAINTS = [
+    ">=8",
+    "<9",
+    "~=1.4.2",
+    "==2.0a1",
+    "==2.0b2",
+    "!=2.0rc3",
+    ">=1.0.post4",
+    "<1.1.dev5",
+    "==1!2.0.post1.dev2",
+]
+
+
+@pytest.fixture()
+def dependencies() -> List[Dependency]:
+    return [
+        Dependency(
+            "click",
+            [Constraint.from_string(c) for c in CONSTRAINTS],
+            env_markers={"python_version": ">=3.8,<4"},
+            extras=["colour"],
+            hashes=[f"sha256:{'a' * 64}"],
+        ),
+        Dependency("severn", location="./severn", editable=True),
+        Dependency("attrs", location=Path("/wheels/attrs-23.1.0-py3-none-any.whl")),
+    ]
+
+
+def _normalized(dependencies: List[Dependency]) -> List[Dependency]:
+    # Locations always come back as strings.
+    for dep in dependencies:
+        if dep.location is not None:
+            dep.location = str(dep.location)
+    return dependencies
+
+
+def test_json_round_trip(dependencies: List[Dependency]) -> None:
+    fp = io.StringIO()
+    assert dump_json(dependencies, fp) == 3
+
+    fp.seek(0)
+    loaded = load_json(fp)
+    assert loaded == _normalized(dependencies)
+    assert [str(c) for c in loaded[0].constraints] == CONSTRAINTS
+
+
+def test_ndjson_round_trip(dependencies: List[Dependency]) -> None:
+    fp = io.StringIO()
+    assert dump_ndjson(dependencies, fp) == 3
+    assert fp.getvalue().count("\n") == 3
+
+    # Blank lines in between are tolerated.
+    lines = io.StringIO(fp.getvalue().replace("\n", "\n\n"))
+    loaded = list(load_ndjson(lines))
+    assert loaded == _normalized(dependencies)
+    assert [str(c) for c in loaded[0].constraints] == CONSTRAINTS
+
+
+def test_empty() -> None:
+    fp = io.StringIO()
+    assert dump_json([], fp) == 0
+    assert fp.getvalue() == "[]\n"
+    assert load_json(io.StringIO(fp.getvalue())) == []
+
+
+def test_defaults_are_trimmed(dependencies: List[Dependency]) -> None:
+    constraints = encode_dependency(dependencies[0])["constraints"]
+    assert constraints[0] == [">=", [8]]
+    assert constraints[3] == ["==", [2, 0], 0, 1]
+    # A field set past a default one keeps everything before it.
+    assert constraints[6] == [">=", [1, 0], 0, *[MAX_VERSION] * 3, 4]
+
+
+@pytest.mark.asyncio()
+async def test_iter_dependencies_order(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("first\n-r b.txt\nmiddle\n-r c.txt\nlast\n")
+    (tmp_path / "b.txt").write_text("b1\n-r d.txt\nb2\n")
+    (tmp_path / "c.txt").write_text("c1\n")
+    (tmp_path / "d.txt").write_text("d1\nd2\n")
+    expected = ["first", "b1", "d1", "d2", "b2", "middle", "c1", "last"]
+
+    reqfile = RequirementsFile(tmp_path / "a.txt")
+    streamed = [d.name async for d in reqfile.iter_dependencies()]
+    assert streamed == expected
+    assert reqfile.includes == [tmp_path / n for n in ("b.txt", "d.txt", "c.txt")]
+
+    parsed = await RequirementsFile(tmp_path / "a.txt").parse()
+    lines = [
+        line
+        async for line in aiter_ndjson(
+            RequirementsFile(tmp_path / "a.txt").iter_dependencies()
+        )
+    ]
+    assert lines == list(iter_ndjson(parsed))
+    assert [json.loads(line)["name"] for line in lines] == expected
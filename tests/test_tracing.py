@@ -0,0 +1,116 @@
+# Copyright (c) 2023-present, Parafoxia, Jonxslays
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright notice, this
+#        list of conditions and the following disclaimer.
+#
+#     2. Redistributions in binary form must reproduce the above copyright notice,
+#        this list of conditions and the following disclaimer in the documentation
+#        and/or other materials provided with the distribution.
+#
+#     3. Neither the name of the copyright holder nor the names of its
+#        contributors may be used to endorse or promote products derived from
+#        this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from severn import tracing
+from severn.api.parsers import RequirementsFile
+from severn.tracing import Span, Tracer
+
+
+@pytest.fixture()
+def tracer() -> Iterator[Tracer]:
+    yield tracing.enable()
+    tracing.disable()
+
+
+def test_disabled_spans_record_nothing() -> None:
+    assert tracing.disable() is None
+    with tracing.span("nothing"):
+        pass
+
+
+def test_chrome_trace(tracer: Tracer) -> None:
+    with tracing.span("outer", "requirements.txt"):
+        with tracing.span("inner"):
+            pass
+
+    trace = tracer.chrome_trace()
+    inner, outer = trace["traceEvents"]
+
+    assert trace["displayTimeUnit"] == "ms"
+    assert (outer["name"], inner["name"]) == ("outer", "inner")
+    assert outer["ph"] == inner["ph"] == "X"
+    assert outer["ts"] == 0
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert outer["args"] == {"detail": "requirements.txt"}
+    assert "args" not in inner
+    assert outer["tid"] == inner["tid"] == 1
+
+
+def test_chrome_trace_separates_tasks(tracer: Tracer) -> None:
+    async def work() -> None:
+        with tracing.span("task"):
+            await asyncio.sleep(0)
+
+    async def main() -> None:
+        await asyncio.gather(work(), work())
+
+    asyncio.run(main())
+    events = tracer.chrome_trace()["traceEvents"]
+    assert sorted(e["tid"] for e in events) == [1, 2]
+
+
+def test_summary_p95() -> None:
+    tracer = Tracer()
+    tracer.spans = [Span("a", None, 0, d * 1_000_000, 1) for d in range(1, 101)]
+    tracer.spans.append(Span("b", None, 0, 5_000_000, 1))
+
+    (a, count, total, p95), b = tracer.summary()
+
+    assert (a, count, total, p95) == ("a", 100, 5050.0, 95.0)
+    assert b == ("b", 1, 5.0, 5.0)
+    assert "p95 ms" in tracer.format_summary()
+
+
+@pytest.mark.parametrize(
+    ("values", "expected"),
+    [([7], 7), ([1, 2], 2), (list(range(1, 21)), 19), (list(range(20, 0, -1)), 19)],
+)
+def test_percentile(values: list, expected: int) -> None:
+    assert tracing._percentile(values, 0.95) == expected
+
+
+def test_include_span_covers_nested_parse(tracer: Tracer, tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("-r b.txt\nclick\n")
+    (tmp_path / "b.txt").write_text("attrs\n")
+
+    asyncio.run(RequirementsFile(tmp_path / "a.txt").parse())
+    spans = {(s.name, str(s.detail)): s for s in tracer.spans}
+    include = spans["reqfile.include", str(tmp_path / "b.txt")]
+    nested_read = spans["reqfile.read", str(tmp_path / "b.txt")]
+    parent_read = spans["reqfile.read", str(tmp_path / "a.txt")]
+
+    # Recorded in the nested file's own task, around its own work.
+    assert include.context == nested_read.context != parent_read.context
+    assert include.start <= nested_read.start